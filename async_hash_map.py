@@ -0,0 +1,400 @@
+# Description: This is an asyncio front-end for the Separate Chaining and Open Addressing HashMaps. Bulk loads, resizes
+# and full scans run in chunks that hand control back to the event loop once a time budget is spent, so no single
+# call stalls the loop. A resize moves the keys into a new table in the background while reads and writes go on.
+
+
+import asyncio
+import time
+
+import hash_map_oa
+import hash_map_sc
+from helper_classes import DynamicArray, EpochArray, LinkedList, sized_iterable, hash_function_1, hash_function_2
+
+
+def _bucket_items(map, pos: int) -> list:
+    """
+    Returns the (key, value) pairs in one bucket of an SC or OA HashMap as a list, so that no iterator over
+    the map is left suspended across an await, where the map's fail-fast iterators would break.
+    """
+    if isinstance(map, hash_map_oa.HashMap):
+        entry = map._buckets[pos]
+        return [(entry.key, entry.value)] if entry and entry.is_tombstone is False else []
+    return [(node.key, node.value) for node in map._buckets[pos]]
+
+
+def _iter_buckets(map):
+    """
+    Generator yielding every (key, value) pair of an SC or OA HashMap a bucket at a time. Each bucket is copied
+    by _bucket_items() before its pairs are yielded, so the generator may be paused across awaits.
+    An empty bucket yields None instead, so that pacing counts the buckets scanned as well as the keys.
+    """
+    pos = 0
+    while pos < map.get_capacity():
+        yield from _bucket_items(map, pos) or (None,)
+        pos += 1
+
+
+class AsyncHashMap:
+    # The clock is only read every CHECK_EVERY items, a chunk may overrun the budget by that many operations
+    CHECK_EVERY = 32
+    # Buckets allocated at a time when building a table, so a chunk costs microseconds however big the table
+    ALLOCATE_CHUNK = 4096
+
+    def __init__(self, map, time_budget: float = 0.005) -> None:
+        """
+        Initialize the wrapper around an SC or OA HashMap.
+        time_budget is the longest, in seconds, a call runs before yielding to the event loop.
+        The wrapper takes the map over: a resize moves its keys to a new table and then leaves it empty,
+        so the map should only be used through the wrapper.
+        """
+        self._map = map
+        self._time_budget = time_budget
+        # While a resize is under way, _map is the new table and _old the one its keys are moved out of.
+        # Every key is in exactly one of them.
+        self._old = None
+        self._resize_task = None
+        self._resize_target = None
+        # Done once the resize under way has swapped in its new table, before the keys are moved over
+        self._resize_ready = None
+        # Tasks freeing replaced buckets, referenced so they are not garbage collected before they finish
+        self._releases = set()
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        if self._old is None:
+            return str(self._map)
+        return 'resizing from:\n' + str(self._old) + 'to:\n' + str(self._map)
+
+    def get_size(self) -> int:
+        """Return size of map."""
+        return self._map.get_size() + (self._old.get_size() if self._old is not None else 0)
+
+    def get_capacity(self) -> int:
+        """Return capacity of map, the capacity being resized to while a resize is under way."""
+        return self._map.get_capacity()
+
+    # ------------------------------------------------------------------ #
+
+    async def _paced(self, iterable):
+        """Async generator yielding from iterable, yielding to the event loop whenever the time budget is spent."""
+        deadline = time.perf_counter() + self._time_budget
+        for count, item in enumerate(iterable, 1):
+            yield item
+            if count % self.CHECK_EVERY == 0 and time.perf_counter() >= deadline:
+                await asyncio.sleep(0)
+                deadline = time.perf_counter() + self._time_budget
+
+    def _capacity_for(self, size: int) -> int:
+        """Helper method returning the capacity the wrapped map needs to hold size keys without resizing itself."""
+        if isinstance(self._map, hash_map_oa.HashMap):
+            return self._map._capacity_for(size, self._map._capacity_policy)
+        return max(1, size)
+
+    async def put(self, key: str, value: object) -> None:
+        """
+        Updates key/value pair in the hash map. If the map is full it first grows to twice its keys,
+        moving them over in chunks, instead of letting the wrapped map resize in one go.
+
+        @param: key - the key used to search, value - the value for the corresponding key
+        @return: None
+        """
+        size = self.get_size() + 1
+        if self._capacity_for(size) > self._map.get_capacity():
+            await self.reserve(2 * size)
+        self._put(key, value)
+
+    def _put(self, key: str, value: object) -> None:
+        """Helper method storing a pair in the current table, taking the key out of the old one if it is there."""
+        if self._old is not None and self._old.contains_key(key):
+            self._old.remove(key)
+        self._map.put(key, value)
+
+    async def put_many(self, pairs, expected_size: int = None) -> None:
+        """
+        Stores every key/value pair, growing the map once up front and yielding to the event loop between chunks.
+
+        @param: pairs - an iterable (or DynamicArray) of (key, value) pairs, later pairs win for repeated keys
+                expected_size - the amount of pairs, taken from pairs when it has a length, or counted otherwise
+        @return: None
+        """
+        pairs, size = sized_iterable(pairs, expected_size)
+        await self.reserve(self.get_size() + size)
+        async for key, value in self._paced(pairs):
+            await self.put(key, value)
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key.
+
+        @param: key used to search
+        @return: the value corresponding to key, None if key is not found
+        """
+        if self._old is not None and self._old.contains_key(key):
+            return self._old.get(key)
+        return self._map.get(key)
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Checks if a given key is in the hash map.
+
+        @param: key - the key used to search
+        @return: boolean indicating if the map has the key
+        """
+        return self._map.contains_key(key) or (self._old is not None and self._old.contains_key(key))
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key(if found) and its associated value from the hash map.
+
+        @param: key used to search
+        @return: None
+        """
+        if self._old is not None:
+            self._old.remove(key)
+        self._map.remove(key)
+
+    async def clear(self) -> None:
+        """
+        Clears the contents of the hash map, does not change table capacity.
+        A resize under way is abandoned, the table being resized to is kept. The first clear of a table
+        allocates its generation stamped buckets in chunks, keys written meanwhile are cleared too,
+        and frees the former buckets in chunks afterwards.
+
+        @param: None
+        @return: None
+        """
+        map, former = self._map, None
+        if not isinstance(map._buckets, EpochArray):
+            buckets = await self._allocate(map.get_capacity(), self._bucket_default(map))
+            # The wrapped map's own clear() then only starts a new generation of the buckets
+            if self._map is map and not isinstance(map._buckets, EpochArray):
+                if not map._pins:
+                    former = map._buckets
+                map._buckets = buckets
+                map._pins = 0
+        self._old = None
+        self._map.clear()
+        if former is not None:
+            # Freed in the background, so that clear() returns with the map empty
+            task = asyncio.ensure_future(self._release(former))
+            self._releases.add(task)
+            task.add_done_callback(self._releases.discard)
+
+    async def reserve(self, size: int) -> None:
+        """
+        Grows the map, in chunks, so that size keys fit without the wrapped map resizing itself.
+        A resize already under way is waited for first.
+
+        @param: size - the amount of keys the map should hold
+        @return: None
+        """
+        while self._capacity_for(size) > self._map.get_capacity():
+            if self._resize_task is not None:
+                # Writes only need the new table swapped in, not every key moved over
+                ready = self._resize_ready
+                await asyncio.shield(self._resize_task if ready.done() else ready)
+            else:
+                await self.resize(self._capacity_for(size))
+
+    async def resize(self, new_capacity: int) -> None:
+        """
+        Changes capacity of the hash table, moving the keys over in chunks while reads and writes carry on.
+        Concurrent calls for the same capacity share one resize, a call for another capacity waits for the
+        resize under way to finish first. The capacity is rounded up so the keys fit without a further resize.
+        Only works when the new_capacity >= 1 and the new_capacity is >= the current size.
+
+        @param: the new capacity of the hash table
+        @return: None
+        """
+        while self._resize_task is not None and self._resize_target != new_capacity:
+            await asyncio.shield(self._resize_task)
+
+        if self._resize_task is None:
+            if new_capacity < 1 or new_capacity < self.get_size():
+                return
+            self._resize_target = new_capacity
+            self._resize_ready = asyncio.get_running_loop().create_future()
+            self._resize_task = asyncio.ensure_future(self._run_resize(new_capacity))
+
+        # Shielded so that cancelling one awaiter doesn't cancel the resize the others are waiting on
+        await asyncio.shield(self._resize_task)
+
+    async def _run_resize(self, new_capacity: int) -> None:
+        """
+        Task allocating a table of new_capacity in chunks, then swapping it in and moving the keys over.
+        Reads and writes keep using the current table until the new one is swapped in.
+        """
+        ready = self._resize_ready
+        try:
+            old = self._map
+            new = await self._new_map(old, max(new_capacity, self._capacity_for(old.get_size())))
+
+            # The old table's index is dropped since its keys are only being removed
+            if old._sorted_index is not None:
+                new.enable_sorted_index()
+                old.disable_sorted_index()
+            self._old = old
+            self._map = new
+            ready.set_result(None)
+            await self._move_keys(old)
+
+            # The old table is empty, or was abandoned by clear(), either way the wrapper is done with it.
+            # It is given fresh buckets and cleared, so it stays a usable empty map, and its former buckets,
+            # holding every chain or entry its keys left behind, are freed in chunks
+            if not old._pins:
+                buckets = await self._allocate(old.get_capacity(), self._bucket_default(old))
+                if not old._pins:
+                    buckets, old._buckets = old._buckets, buckets
+                    old.clear()
+                    await self._release(buckets)
+        finally:
+            if not ready.done():
+                ready.set_result(None)
+            if self._resize_task is asyncio.current_task():
+                self._resize_task = None
+                self._resize_target = None
+
+    async def _new_map(self, old, capacity: int):
+        """
+        Helper method building an empty map like old, with the same hash function and opt-in features.
+        Constructing the map with capacity buckets would allocate them in one go, so it is built with a
+        single bucket and given its buckets, allocated in chunks, afterwards.
+        """
+        if isinstance(old, hash_map_oa.HashMap):
+            capacity = old._round_capacity(capacity, old._capacity_policy)
+            new = hash_map_oa.HashMap(1, old._hash_function)
+            new._capacity_policy = old._capacity_policy
+        else:
+            new = hash_map_sc.HashMap(1, old._hash_function)
+        new._buckets = await self._allocate(capacity, self._bucket_default(old))
+        new._capacity = capacity
+
+        # The stats and timings keep accumulating in the same collectors, the Bloom filter is rebuilt as
+        # the keys arrive
+        new._stats = old._stats
+        new._guard_limit = old._guard_limit
+        if old._bloom is not None:
+            new.enable_bloom_filter(old._bloom.false_positive_rate)
+        if old._profile is not None:
+            new.enable_profiling(old._profile)
+        return new
+
+    @staticmethod
+    def _bucket_default(map):
+        """Helper method returning what an empty bucket of map holds, or the factory making one."""
+        return None if isinstance(map, hash_map_oa.HashMap) else LinkedList
+
+    async def _allocate(self, capacity: int, default) -> EpochArray:
+        """Helper method allocating capacity empty buckets, ALLOCATE_CHUNK at a time."""
+        buckets = EpochArray(0, default)
+        async for start in self._paced(range(0, capacity, self.ALLOCATE_CHUNK)):
+            buckets.grow(min(self.ALLOCATE_CHUNK, capacity - start))
+        return buckets
+
+    async def _release(self, buckets: DynamicArray) -> None:
+        """
+        Helper method freeing buckets no map uses anymore a bucket at a time, freeing millions of
+        them at once would stall the loop just like allocating them.
+        """
+        async for _ in self._paced(range(buckets.length())):
+            buckets.pop()
+
+    async def _move_keys(self, old) -> None:
+        """
+        Task moving every key of old into the current table, a chunk at a time.
+        The old table may be restructured by its own collision guard while keys are looked up in it,
+        so it is walked again until it is empty. Stops early if clear() abandoned the resize.
+        """
+        try:
+            while self._old is old and old.get_size() > 0:
+                async for item in self._paced(_iter_buckets(old)):
+                    if self._old is not old:
+                        return
+                    # Keys only leave the old table while the walk is paused, those are skipped
+                    if item is not None and old.contains_key(item[0]):
+                        key, value = item
+                        self._map.put(key, value)
+                        old.remove(key)
+        finally:
+            if self._old is old:
+                self._old = None
+
+    def _iter_items(self):
+        """
+        Generator yielding every (key, value) pair, following the keys if a resize moves them meanwhile.
+        Keys only move from the old table to the new one, so the old table is walked first, then whichever
+        table it was being resized to. Tables are walked a bucket at a time, see _iter_buckets(),
+        so None is yielded for every empty bucket.
+        """
+        source = self._old if self._old is not None else self._map
+        while True:
+            yield from _iter_buckets(source)
+            successor = self._old if self._old is not None and self._old is not source else self._map
+            if successor is source:
+                return
+            source = successor
+
+    async def items(self):
+        """
+        Async generator yielding every (key, value) pair, yielding to the event loop between chunks.
+        Keys in the map for the whole iteration are yielded at least once, a key that a resize moved
+        after it was yielded may be yielded again. Keys added or removed meanwhile may or may not be seen.
+        """
+        async for item in self._paced(self._iter_items()):
+            if item is not None:
+                yield item
+
+    async def keys(self):
+        """Async generator yielding every key, see items()."""
+        async for key, _ in self.items():
+            yield key
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    async def ticker(stop: asyncio.Event, gaps: list) -> None:
+        """Measures the longest stretch the event loop was kept from running other tasks."""
+        last = time.perf_counter()
+        while not stop.is_set():
+            await asyncio.sleep(0)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    async def example(map) -> None:
+        m = AsyncHashMap(map, time_budget=0.002)
+        stop, gaps = asyncio.Event(), []
+        tick = asyncio.ensure_future(ticker(stop, gaps))
+
+        await m.put_many(('key' + str(i), i) for i in range(20000))
+        print(m.get_size(), m.get_capacity(), m.get('key123'))
+
+        # Two awaiters of the same resize share it, writes and reads carry on while it runs
+        first = asyncio.ensure_future(m.resize(100000))
+        second = asyncio.ensure_future(m.resize(100000))
+        await asyncio.sleep(0)
+        await m.put('new key', -1)
+        m.remove('key5')
+        print(m.get('key7'), m.get('key5'), m.contains_key('new key'), m._old is not None)
+        await asyncio.gather(first, second)
+        print(m.get_size(), m.get_capacity(), m._old is None)
+
+        count = 0
+        async for key in m.keys():
+            count += 1
+        await m.clear()
+        print(count, m.get_size(), m.get_capacity())
+
+        stop.set()
+        await tick
+        print(max(gaps) < 0.1)
+
+    print("\nasync SC example 1")
+    print("------------------")
+    asyncio.run(example(hash_map_sc.HashMap(100, hash_function_1)))
+
+    print("\nasync OA example 1")
+    print("------------------")
+    asyncio.run(example(hash_map_oa.HashMap(100, hash_function_2)))
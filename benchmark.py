@@ -0,0 +1,351 @@
+# Description: Reproducible benchmark harness comparing the HashMap implementations against the built-in dict.
+# Every engine is run against the same seeded workloads and the results are reported as JSON, e.g.
+#
+#     python benchmark.py --sizes 1000 10000 --output bench_output.txt
+
+
+import argparse
+import itertools
+import json
+import math
+import multiprocessing
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import hash_map_compact
+import hash_map_cuckoo
+import hash_map_int
+import hash_map_oa
+import hash_map_sc
+import hash_map_swiss
+from helper_classes import hash_function_1, hash_function_2
+
+
+class DictMap:
+    """
+    Adapter giving the built-in dict the same put/get/remove/contains_key interface as the HashMaps,
+    used as the baseline every engine is compared against. The hash function is ignored.
+    """
+
+    def __init__(self, capacity: int, function) -> None:
+        """Initialize an empty dict, capacity and function are accepted for a uniform constructor."""
+        self._data = {}
+
+    def put(self, key: str, value: object) -> None:
+        """Insert or replace the value stored under key."""
+        self._data[key] = value
+
+    def get(self, key: str) -> object:
+        """Return the value stored under key, None if absent."""
+        return self._data.get(key)
+
+    def contains_key(self, key: str) -> bool:
+        """Return True if key is stored."""
+        return key in self._data
+
+    def remove(self, key: str) -> None:
+        """Remove key if present."""
+        self._data.pop(key, None)
+
+    def get_size(self) -> int:
+        """Return the amount of stored keys."""
+        return len(self._data)
+
+
+def _int_key(key: str) -> int:
+    """Map a workload key to a distinct integer ID: 'key42' becomes 42, any other string its 63 bit encoding."""
+    if key.startswith('key') and key[3:].isdigit():
+        return int(key[3:])
+    return int.from_bytes(key.encode(), 'big') & 0x7FFFFFFFFFFFFFFF
+
+
+def _oa_with_policy(policy: str):
+    """Return an engine building Open Addressing HashMaps that follow the given capacity policy."""
+    def engine(capacity: int, function) -> hash_map_oa.HashMap:
+        m = hash_map_oa.HashMap(capacity, function)
+        m.set_capacity_policy(policy)
+        return m
+    return engine
+
+
+# Engines are constructed as engine(capacity, hash_function), new engines only need an entry here.
+ENGINES = {
+    'sc': hash_map_sc.HashMap,
+    'oa': hash_map_oa.HashMap,
+    'oa_pow2': _oa_with_policy(hash_map_oa.HashMap.POWER_OF_TWO),
+    'oa_prime': _oa_with_policy(hash_map_oa.HashMap.PRIME),
+    'cuckoo': hash_map_cuckoo.HashMap,
+    'compact': hash_map_compact.HashMap,
+    'swiss': hash_map_swiss.HashMap,
+    'int': lambda capacity, function: hash_map_int.HashMap(capacity),
+    'dict': DictMap,
+}
+
+# Engines that don't take string keys, their workload keys are converted first
+KEY_CONVERTERS = {
+    'int': _int_key,
+}
+
+HASH_FUNCTIONS = {
+    'hash_function_1': hash_function_1,
+    'hash_function_2': hash_function_2,
+}
+
+
+# ------------------------- WORKLOADS ------------------------------- #
+# Each workload returns (setup_ops, timed_ops), lists of (method name, args) tuples. Only the timed
+# operations count towards ops/sec and latency, the setup operations only populate the map.
+
+def _keys(start: int, stop: int) -> list:
+    """Return distinct string keys numbered from start to stop - 1."""
+    return ['key' + str(i) for i in range(start, stop)]
+
+
+def insert_heavy(size: int, rng: random.Random) -> (list, list):
+    """Insert size distinct keys, overwriting a tenth of them afterwards."""
+    keys = _keys(0, size)
+    timed = [('put', (key, i)) for i, key in enumerate(keys)]
+    timed += [('put', (key, -1)) for key in rng.sample(keys, size // 10)]
+    return [], timed
+
+
+def read_heavy(size: int, rng: random.Random) -> (list, list):
+    """Populate size keys, then read them back with one miss for every four hits."""
+    keys = _keys(0, size)
+    setup = [('put', (key, i)) for i, key in enumerate(keys)]
+    pool = keys + _keys(size, size + size // 4)
+    timed = [('get', (rng.choice(pool),)) for _ in range(size)]
+    timed += [('contains_key', (rng.choice(pool),)) for _ in range(size)]
+    return setup, timed
+
+
+def delete_churn(size: int, rng: random.Random) -> (list, list):
+    """Populate size keys, then repeatedly remove an old key and insert a fresh one."""
+    keys = _keys(0, size)
+    setup = [('put', (key, i)) for i, key in enumerate(keys)]
+    rng.shuffle(keys)
+    timed = []
+    for i, key in enumerate(keys):
+        timed.append(('remove', (key,)))
+        timed.append(('put', ('key' + str(size + i), i)))
+    return setup, timed
+
+
+def zipfian(size: int, rng: random.Random, exponent: float = 1.1) -> (list, list):
+    """Populate size keys, then read (80%) and update (20%) them with Zipf distributed popularity."""
+    keys = _keys(0, size)
+    setup = [('put', (key, i)) for i, key in enumerate(keys)]
+    weights = [1 / (rank ** exponent) for rank in range(1, size + 1)]
+    timed = []
+    for i, key in enumerate(rng.choices(keys, weights=weights, k=2 * size)):
+        timed.append(('put', (key, i)) if rng.random() < 0.2 else ('get', (key,)))
+    return setup, timed
+
+
+def adversarial_collision(size: int, rng: random.Random) -> (list, list):
+    """Insert then read anagrams of one word, which all share a single hash under hash_function_1."""
+    keys = [''.join(letters) for letters in itertools.islice(itertools.permutations('abcdefghij'), size)]
+    timed = [('put', (key, i)) for i, key in enumerate(keys)]
+    timed += [('get', (key,)) for key in rng.sample(keys, len(keys))]
+    return [], timed
+
+
+WORKLOADS = {
+    'insert_heavy': insert_heavy,
+    'read_heavy': read_heavy,
+    'delete_churn': delete_churn,
+    'zipfian': zipfian,
+    'adversarial_collision': adversarial_collision,
+}
+
+
+# ------------------------- MEASUREMENT ----------------------------- #
+
+def _percentile(sorted_values: list, fraction: float) -> int:
+    """Return the nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _replay(engine, capacity: int, function, setup: list, timed: list, latencies: list = None):
+    """
+    Builds a map and replays the workload against it.
+
+    @param: engine, capacity, function - used to construct the map
+            setup, timed - the workload operations
+            latencies - if given, the nanoseconds taken by each timed operation are appended to it
+    @return: the map, so it stays alive while memory is measured, and the seconds taken by the timed operations
+    """
+    m = engine(capacity, function)
+    for name, args in setup:
+        getattr(m, name)(*args)
+
+    calls = [(getattr(m, name), args) for name, args in timed]
+    if latencies is None:
+        start = time.perf_counter()
+        for method, args in calls:
+            method(*args)
+        return m, time.perf_counter() - start
+
+    clock = time.perf_counter_ns
+    append = latencies.append
+    for method, args in calls:
+        start = clock()
+        method(*args)
+        append(clock() - start)
+    return m, sum(latencies) / 1e9
+
+
+def _peak_memory(engine, capacity: int, function, setup: list, timed: list) -> int:
+    """
+    Builds a map and replays the workload against it under tracemalloc. Unlike _replay() no list of
+    calls is built up front, so the peak only counts what the map itself allocates.
+
+    @param: engine, capacity, function - used to construct the map
+            setup, timed - the workload operations
+    @return: the peak bytes allocated
+    """
+    tracemalloc.start()
+    m = engine(capacity, function)
+    for name, args in itertools.chain(setup, timed):
+        getattr(m, name)(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del m
+    return peak
+
+
+def run_case(engine_name: str, workload_name: str, size: int, load_factor: float,
+             function_name: str, seed: int, measure_memory: bool = True) -> dict:
+    """
+    Runs one engine/workload/size/load factor/hash function combination.
+
+    @param: the names of the combination to run, the seed used to generate the workload,
+            measure_memory - whether to do an extra tracemalloc pass for the peak memory
+    @return: a dict of the measurements for the combination
+    """
+    engine = ENGINES[engine_name]
+    function = HASH_FUNCTIONS[function_name]
+    capacity = max(1, math.ceil(size / load_factor))
+    setup, timed = WORKLOADS[workload_name](size, random.Random(seed))
+    if engine_name in KEY_CONVERTERS:
+        convert = KEY_CONVERTERS[engine_name]
+        setup = [(name, (convert(args[0]),) + args[1:]) for name, args in setup]
+        timed = [(name, (convert(args[0]),) + args[1:]) for name, args in timed]
+
+    # Throughput pass without per operation timing, then a latency pass, then a memory pass
+    elapsed = _replay(engine, capacity, function, setup, timed)[1]
+
+    latencies = []
+    _replay(engine, capacity, function, setup, timed, latencies)
+    latencies.sort()
+
+    peak = _peak_memory(engine, capacity, function, setup, timed) if measure_memory else None
+
+    return {
+        'engine': engine_name,
+        'workload': workload_name,
+        'size': size,
+        'load_factor': load_factor,
+        'initial_capacity': capacity,
+        'hash_function': function_name,
+        'ops': len(timed),
+        'seconds': elapsed,
+        'ops_per_sec': len(timed) / elapsed if elapsed else None,
+        'p50_ns': _percentile(latencies, 0.50),
+        'p99_ns': _percentile(latencies, 0.99),
+        'peak_memory_bytes': peak,
+    }
+
+
+def _failed_case(args: tuple, **details) -> dict:
+    """Return the result of a combination that didn't finish, details saying why."""
+    engine_name, workload_name, size, load_factor, function_name = args[:5]
+    return dict({'engine': engine_name, 'workload': workload_name, 'size': size,
+                 'load_factor': load_factor, 'hash_function': function_name}, **details)
+
+
+def _run_case_worker(queue, args) -> None:
+    """Process target running run_case and reporting the result, or the error it raised, through a queue."""
+    try:
+        queue.put(run_case(*args))
+    except Exception as error:
+        queue.put(_failed_case(args, error=repr(error)))
+
+
+def run_case_with_timeout(args: tuple, timeout: float) -> dict:
+    """
+    Runs run_case(*args) in a child process so a pathological case (e.g. a probe sequence that
+    never finds a free slot) is reported as a timeout instead of hanging the whole suite,
+    and a case that raises or kills its process is reported as an error.
+    """
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_run_case_worker, args=(queue, args))
+    process.start()
+    process.join(timeout)
+    if process.is_alive():
+        process.terminate()
+        process.join()
+        return _failed_case(args, timeout=timeout)
+    # A process that died without reporting, e.g. killed or out of memory, leaves the queue empty
+    if process.exitcode != 0:
+        return _failed_case(args, error='exit code ' + str(process.exitcode))
+    return queue.get()
+
+
+def run_suite(engines: list, workloads: list, sizes: list, load_factors: list,
+              functions: list, seed: int, measure_memory: bool = True, timeout: float = None) -> dict:
+    """
+    Runs every combination of the given parameters.
+
+    @param: lists of engine, workload and hash function names, sizes and load factors,
+            seed - the workload seed, measure_memory - whether to record peak memory,
+            timeout - seconds allowed per combination, None to run everything in process
+    @return: a JSON serializable report
+    """
+    results = []
+    for args in itertools.product(engines, workloads, sizes, load_factors, functions):
+        args = args + (seed, measure_memory)
+        results.append(run_case_with_timeout(args, timeout) if timeout else run_case(*args))
+
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'seed': seed,
+        'results': results,
+    }
+
+
+def main(argv: list = None) -> None:
+    """Command line entry point, prints or writes the JSON report."""
+    parser = argparse.ArgumentParser(description='Benchmark the HashMap implementations against dict.')
+    parser.add_argument('--engines', nargs='+', default=list(ENGINES), choices=list(ENGINES))
+    parser.add_argument('--workloads', nargs='+', default=list(WORKLOADS), choices=list(WORKLOADS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000])
+    parser.add_argument('--load-factors', nargs='+', type=float, default=[0.25, 0.5, 1.0])
+    parser.add_argument('--hash-functions', nargs='+', default=list(HASH_FUNCTIONS), choices=list(HASH_FUNCTIONS))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=120.0, help='seconds per case, 0 disables')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc pass')
+    parser.add_argument('--output', help='file to write the JSON report to instead of stdout')
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.engines, args.workloads, args.sizes, args.load_factors, args.hash_functions,
+                       args.seed, not args.no_memory, args.timeout or None)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+# Description: This is a compact, insertion ordered HashMap in the style of CPython's dict. A sparse index of small
+# integers (int8/16/32/64 depending on capacity) points into dense arrays of hashes, keys and values, so empty
+# slots only cost one or a few bytes, get_keys() is a tight scan of the dense arrays and keys come back in the
+# order they were inserted.
+
+
+from array import array
+
+from helper_classes import (DynamicArray,
+                            hash_function_1, hash_function_2)
+
+
+class HashMap:
+    # Index slot markers, anything >= 0 is a position in the dense entry arrays
+    EMPTY = -1
+    DUMMY = -2
+    # The index is grown once two thirds of its slots point at entries (live or removed)
+    MAX_LOAD = 2 / 3
+    MIN_CAPACITY = 8
+    PERTURB_SHIFT = 5
+
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Initialize new HashMap with an index of at least capacity slots, rounded up to a power of two.
+        """
+        self._hash_function = function
+        self._hashes = self._keys = self._values = DynamicArray()
+        self._build(self._index_size(capacity))
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        out = 'index: ' + str(self._index.tolist()) + '\n'
+        for i in range(self._keys.length()):
+            if self._hashes[i] is not None:
+                out += str(i) + ': ' + str(self._keys[i]) + ': ' + str(self._values[i]) + '\n'
+        return out
+
+    def get_size(self) -> int:
+        """Return size of map."""
+        return self._size
+
+    def get_capacity(self) -> int:
+        """Return capacity of map, the number of index slots."""
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def _index_size(self, capacity: int) -> int:
+        """Helper method rounding capacity up to a power of two no smaller than MIN_CAPACITY."""
+        size = self.MIN_CAPACITY
+        while size < capacity:
+            size *= 2
+        return size
+
+    @staticmethod
+    def _typecode(capacity: int) -> str:
+        """
+        Helper method picking the smallest signed array type able to hold every entry position of an index.
+        The markers are negative, so e.g. int8 serves indexes of up to 128 slots.
+        """
+        for typecode in 'bhiq':
+            if capacity - 1 <= 2 ** (8 * array(typecode).itemsize - 1) - 1:
+                return typecode
+        return 'q'
+
+    def _build(self, capacity: int) -> None:
+        """
+        Helper method building an index of capacity slots over the live entries, dropping removed ones.
+        Hashes are kept with the entries, so the hash function isn't called again.
+
+        @param: capacity - the new amount of index slots, a power of two
+        @return: None
+        """
+        hashes, keys, values = self._hashes, self._keys, self._values
+
+        self._capacity = capacity
+        self._index = array(self._typecode(capacity), [self.EMPTY]) * capacity
+        self._usable = int(capacity * self.MAX_LOAD)
+        self._hashes = DynamicArray()
+        self._keys = DynamicArray()
+        self._values = DynamicArray()
+        self._size = 0
+
+        for pos in range(hashes.length()):
+            if hashes[pos] is not None:
+                self._append(hashes[pos], keys[pos], values[pos], self._free_slot(hashes[pos]))
+
+    def _slots(self, hash: int):
+        """Generator yielding the index slots probed for a hash, using CPython's perturbed probing."""
+        mask = self._capacity - 1
+        perturb = hash & 0xFFFFFFFFFFFFFFFF
+        slot = perturb & mask
+        while True:
+            yield slot
+            perturb >>= self.PERTURB_SHIFT
+            slot = (slot * 5 + perturb + 1) & mask
+
+    def _lookup(self, key: str, hash: int) -> (int, int):
+        """
+        Helper method probing the index for a key.
+
+        @param: key - the key used to search, hash - its hash
+        @return: (index slot, entry position) of the key, or (first empty slot, EMPTY) if it is absent
+        """
+        index, hashes, keys = self._index, self._hashes, self._keys
+        for slot in self._slots(hash):
+            pos = index[slot]
+            if pos == self.EMPTY:
+                return slot, self.EMPTY
+            if pos >= 0 and hashes[pos] == hash and keys[pos] == key:
+                return slot, pos
+
+    def _free_slot(self, hash: int) -> int:
+        """Helper method returning the first empty index slot probed for a hash."""
+        for slot in self._slots(hash):
+            if self._index[slot] == self.EMPTY:
+                return slot
+
+    def _append(self, hash: int, key: str, value: object, slot: int) -> None:
+        """Helper method appending an entry to the dense arrays and pointing an index slot at it."""
+        self._index[slot] = self._keys.length()
+        self._hashes.append(hash)
+        self._keys.append(key)
+        self._values.append(value)
+        self._size += 1
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates key/value pair in the hash map. If the key already exists, its value is replaced
+        in place and it keeps its position in the insertion order, otherwise it is appended.
+
+        @param: key - the key used to search, value - the value for the corresponding key
+        @return: None
+        """
+        hash = self._hash_function(key)
+        slot, pos = self._lookup(key, hash)
+        if pos >= 0:
+            self._values[pos] = value
+            return
+
+        # Removed entries still take up room in the dense arrays, so growth is based on every appended entry,
+        # the rebuild drops them and sizes the index for three times the live entries like CPython does
+        if self._keys.length() >= self._usable:
+            self._build(self._index_size(3 * (self._size + 1)))
+            slot = self._free_slot(hash)
+        self._append(hash, key, value, slot)
+
+    def table_load(self) -> float:
+        """
+        Computes the load factor using the formula size/capacity
+
+        @param: None
+        @return: a floating point number indicating the load factor
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of index slots that don't point at a live entry.
+
+        @param: None
+        @return: an integer indicating the amount of empty buckets
+        """
+        return self._capacity - self._size
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Rebuilds the index with new_capacity slots rounded up to a power of two (and to keep the
+        load under two thirds), compacting away removed entries. The insertion order is kept.
+        Only works when the new_capacity >= 1 and the new_capacity is >= the current size.
+
+        @param: the new capacity of the index
+        @return: None
+        """
+        if new_capacity >= 1 and new_capacity >= self._size:
+            self._build(self._index_size(max(new_capacity, int(self._size / self.MAX_LOAD) + 1)))
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key
+
+        @param: key used to search
+        @return: the value corresponding to key, None if key is not found
+        """
+        pos = self._lookup(key, self._hash_function(key))[1]
+        if pos >= 0:
+            return self._values[pos]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Checks if a given key is in the hash map.
+
+        @param: key - the key used to search
+        @return: boolean indicating if the map has the key
+        """
+        return self._lookup(key, self._hash_function(key))[1] >= 0
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key(if found) and its associated value from the hash map. The index slot becomes
+        a dummy so probes carry on past it, and the entry is left as a hole until the next rebuild.
+
+        @param: key used to search
+        @return: None
+        """
+        slot, pos = self._lookup(key, self._hash_function(key))
+        if pos < 0:
+            return
+
+        self._index[slot] = self.DUMMY
+        self._hashes[pos] = None
+        self._keys[pos] = None
+        self._values[pos] = None
+        self._size -= 1
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map, does not change table capacity.
+
+        @param: None
+        @return: None
+        """
+        self._hashes = DynamicArray()
+        self._keys = DynamicArray()
+        self._values = DynamicArray()
+        self._index = array(self._index.typecode, [self.EMPTY]) * self._capacity
+        self._size = 0
+
+    def get_keys(self) -> DynamicArray:
+        """
+        Returns a DA that has all the keys stored in the hash map, in insertion order.
+
+        @param: None
+        @return: the DA storing all the keys of hash map
+        """
+        keys_arr = DynamicArray()
+        for key, _ in self._iter_items():
+            keys_arr.append(key)
+        return keys_arr
+
+    def _iter_items(self):
+        """Generator yielding every live (key, value) pair in insertion order."""
+        for pos in range(self._keys.length()):
+            if self._hashes[pos] is not None:
+                yield self._keys[pos], self._values[pos]
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nput example 1")
+    print("-------------")
+    m = HashMap(50, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity(), m._index.typecode)
+
+    print("\nget example 1")
+    print("-------------")
+    m = HashMap(150, hash_function_2)
+    for i in range(200, 300, 7):
+        m.put(str(i), i * 10)
+    print(m.get_size(), m.get_capacity())
+    for i in range(200, 300, 21):
+        print(i, m.get(str(i)), m.get(str(i)) == i * 10)
+        print(i + 1, m.get(str(i + 1)), m.get(str(i + 1)) == (i + 1) * 10)
+
+    print("\nremove example 1")
+    print("----------------")
+    m = HashMap(50, hash_function_1)
+    print(m.get('key1'))
+    m.put('key1', 10)
+    print(m.get('key1'))
+    m.remove('key1')
+    print(m.get('key1'))
+    m.remove('key4')
+
+    print("\nget_keys example 1")
+    print("------------------")
+    # Keys come back in insertion order, an update keeps the key's position and a removal leaves a hole
+    m = HashMap(10, hash_function_2)
+    for i in range(100, 200, 10):
+        m.put(str(i), str(i * 10))
+    print(m.get_keys())
+
+    m.resize_table(1)
+    print(m.get_keys(), m.get_capacity())
+
+    m.put('200', '2000')
+    m.put('100', '1')
+    m.remove('110')
+    m.resize_table(2)
+    print(m.get_keys())
+
+    print("\nclear example 1")
+    print("---------------")
+    m = HashMap(100, hash_function_1)
+    m.put('key1', 10)
+    m.put('key2', 20)
+    m.put('key1', 30)
+    print(m.get_size(), m.get_capacity())
+    m.clear()
+    print(m.get_size(), m.get_capacity(), m.get_keys())
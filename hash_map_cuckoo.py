@@ -0,0 +1,345 @@
+# Description: This is a HashMap implementation with Cuckoo Hashing using HashEntries. Every key can only live in
+# one slot of each of the two tables (or in a small stash), so get() examines at most two slots plus the stash.
+
+
+import itertools
+import math
+
+from helper_classes import (DynamicArray, HashEntry, keyed_hash_function, seeded_hash_function,
+                            hash_function_1, hash_function_2)
+
+
+class HashMap:
+    # Entries that couldn't be placed within the displacement bound wait here before forcing a rehash
+    STASH_SIZE = 4
+    # Cuckoo hashing with two functions fails quickly past half full, so the map grows before that
+    MAX_LOAD = 0.5
+    # Rehash attempts with fresh seeds before switching to keyed hash functions, then before growing
+    RESEED_ATTEMPTS = 2
+    GROW_ATTEMPTS = 4
+
+    def __init__(self, capacity: int, function=hash_function_1, function_2=hash_function_2) -> None:
+        """
+        Initialize new HashMap that uses cuckoo hashing for collision resolution.
+        The capacity is split between the two tables, each table hashes with a seeded version of its function.
+        """
+        self._base_functions = (function, function_2)
+        self._hash_function = function
+        self._size = 0
+        self._reset(capacity)
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        out = ''
+        for table in range(2):
+            for i in range(self._table_size):
+                out += str(table) + '.' + str(i) + ': ' + str(self._tables[table][i]) + '\n'
+        return out + 'stash: ' + ', '.join(str(self._stash[i]) for i in range(self._stash.length())) + '\n'
+
+    def get_size(self) -> int:
+        """Return size of map."""
+        return self._size
+
+    def get_capacity(self) -> int:
+        """Return capacity of map, the slots of both tables combined."""
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def _reset(self, capacity: int) -> None:
+        """
+        Helper method replacing both tables with empty ones and drawing new seeds for the hash functions.
+        Size is not touched, the caller re-inserts the entries.
+
+        @param: capacity - the combined capacity of both tables
+        @return: None
+        """
+        self._table_size = max(1, (capacity + 1) // 2)
+        self._capacity = 2 * self._table_size
+        self._functions = (seeded_hash_function(self._base_functions[0]),
+                           seeded_hash_function(self._base_functions[1]))
+        self._tables = (DynamicArray(), DynamicArray())
+        for _ in range(self._table_size):
+            self._tables[0].append(None)
+            self._tables[1].append(None)
+        self._stash = DynamicArray()
+
+        # An insert may displace O(log n) entries before it is sent to the stash
+        self._max_displacements = 8 + 3 * math.ceil(math.log2(self._table_size + 1))
+
+    def _slot(self, table: int, key: str) -> int:
+        """Helper method returning the only index the key may occupy in the given table."""
+        return self._functions[table](key) % self._table_size
+
+    def _find(self, key: str) -> (int, int):
+        """
+        Helper method looking the key up in both tables, then in the stash.
+
+        @param: key - the key used to search
+        @return: (table, index) of the key's entry, table being 2 for the stash, or None if absent
+        """
+        for table in range(2):
+            index = self._slot(table, key)
+            entry = self._tables[table][index]
+            if entry is not None and entry.key == key:
+                return table, index
+
+        for index in range(self._stash.length()):
+            if self._stash[index].key == key:
+                return 2, index
+        return None
+
+    def _insert(self, entry: HashEntry) -> HashEntry:
+        """
+        Helper method placing a new entry, kicking the occupants of its slots to their other table as needed.
+
+        @param: entry - the entry of a key that isn't in the map yet
+        @return: None if every entry found a slot, otherwise the entry left homeless once the stash is full
+        """
+        # Take a free slot in either table straight away if there is one
+        for table in range(2):
+            index = self._slot(table, entry.key)
+            if self._tables[table][index] is None:
+                self._tables[table][index] = entry
+                return None
+
+        # Otherwise evict the occupant, which moves to its slot in the other table, and so on
+        table = 0
+        for _ in range(self._max_displacements):
+            index = self._slot(table, entry.key)
+            entry, self._tables[table][index] = self._tables[table][index], entry
+            if entry is None:
+                return None
+            table = 1 - table
+
+        if self._stash.length() < self.STASH_SIZE:
+            self._stash.append(entry)
+            return None
+        return entry
+
+    def _rehash(self, new_capacity: int, pending: HashEntry = None) -> None:
+        """
+        Helper method rebuilding the tables with new seeds until every entry has a slot. Fresh seeds fix
+        unlucky placements; if they don't, the base functions can't tell the keys apart (e.g. anagrams under
+        hash_function_1), so they are swapped for keyed hash functions, and as a last resort the tables grow.
+
+        @param: new_capacity - the combined capacity to rebuild with
+                pending - an entry that isn't stored anywhere yet and must be placed too
+        @return: None
+        """
+        entries = self._entries()
+        if pending is not None:
+            entries.append(pending)
+
+        for attempt in itertools.count(1):
+            self._reset(new_capacity)
+            if all(self._insert(entry) is None for entry in entries):
+                return
+
+            if attempt == self.RESEED_ATTEMPTS:
+                self._base_functions = (keyed_hash_function(), keyed_hash_function())
+            elif attempt >= self.GROW_ATTEMPTS:
+                new_capacity *= 2
+
+    def _entries(self) -> list:
+        """Helper method returning every entry stored in the tables and the stash."""
+        entries = []
+        for table in self._tables:
+            for index in range(self._table_size):
+                if table[index] is not None:
+                    entries.append(table[index])
+        for index in range(self._stash.length()):
+            entries.append(self._stash[index])
+        return entries
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates key/value pair in the hash map. If the key already exists, its value is replaced
+        with the new value, otherwise it is added on as usual. The tables grow once the load factor
+        reaches 0.5, and are rehashed if an insert can't be placed within the displacement bound.
+
+        @param: key - the key used to search, value - the value for the corresponding key
+        @return: None
+        """
+        found = self._find(key)
+        if found is not None:
+            table, index = found
+            entry = self._stash[index] if table == 2 else self._tables[table][index]
+            entry.value = value
+            return
+
+        if self.table_load() >= self.MAX_LOAD:
+            self._rehash(2 * self._capacity)
+
+        homeless = self._insert(HashEntry(key, value))
+        if homeless is not None:
+            self._rehash(self._capacity, homeless)
+        self._size += 1
+
+    def table_load(self) -> float:
+        """
+        Computes the load factor using the formula size/capacity
+
+        @param: None
+        @return: a floating point number indicating the load factor
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty slots across both tables.
+
+        @param: None
+        @return: an integer indicating the amount of empty buckets
+        """
+        count = 0
+        for table in self._tables:
+            for index in range(self._table_size):
+                if table[index] is None:
+                    count += 1
+        return count
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes capacity of the hash tables, keeps all existing key/value pairs while rehashing them.
+        Only works when the new_capacity >= 1 and the new_capacity is >= the current size,
+        the tables may end up larger if the entries can't be placed at that capacity.
+
+        @param: the new combined capacity of the hash tables
+        @return: None
+        """
+        if new_capacity >= 1 and new_capacity >= self._size:
+            self._rehash(new_capacity)
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key, looking at no more than two slots and the stash.
+
+        @param: key used to search
+        @return: the value corresponding to key, None if key is not found
+        """
+        found = self._find(key)
+        if found is None:
+            return None
+        table, index = found
+        return self._stash[index].value if table == 2 else self._tables[table][index].value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Checks if a given key is in the hash map.
+
+        @param: key - the key used to search
+        @return: boolean indicating if the map has the key
+        """
+        return self._find(key) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key(if found) and its associated value from the hash map.
+        Cuckoo hashing needs no tombstones, the slot is simply emptied.
+
+        @param: key used to search
+        @return: None
+        """
+        found = self._find(key)
+        if found is None:
+            return
+
+        table, index = found
+        if table == 2:
+            # Swap the stashed entry to the end so it can be popped
+            self._stash.swap(index, self._stash.length() - 1)
+            self._stash.pop()
+        else:
+            self._tables[table][index] = None
+        self._size -= 1
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map, does not change table capacity.
+
+        @param: None
+        @return: None
+        """
+        self._reset(self._capacity)
+        self._size = 0
+
+    def get_keys(self) -> DynamicArray:
+        """
+        Returns a DA that has all the keys stored in the hash map.
+
+        @param: None
+        @return: the DA storing all the keys of hash map
+        """
+        keys_arr = DynamicArray()
+        for entry in self._entries():
+            keys_arr.append(entry.key)
+        return keys_arr
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nput example 1")
+    print("-------------")
+    m = HashMap(50, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.table_load() <= 0.5, m.get_size(), m.get_capacity())
+
+    print("\nget example 1")
+    print("-------------")
+    m = HashMap(150, hash_function_2)
+    for i in range(200, 300, 7):
+        m.put(str(i), i * 10)
+    print(m.get_size())
+    for i in range(200, 300, 21):
+        print(i, m.get(str(i)), m.get(str(i)) == i * 10)
+        print(i + 1, m.get(str(i + 1)), m.get(str(i + 1)) == (i + 1) * 10)
+
+    print("\nremove example 1")
+    print("----------------")
+    m = HashMap(50, hash_function_1)
+    print(m.get('key1'))
+    m.put('key1', 10)
+    print(m.get('key1'))
+    m.remove('key1')
+    print(m.get('key1'), m.contains_key('key1'), m.get_size())
+    m.remove('key4')
+
+    print("\nresize example 1")
+    print("----------------")
+    m = HashMap(75, hash_function_2)
+    keys = [i for i in range(1, 1000, 13)]
+    for key in keys:
+        m.put(str(key), key * 42)
+
+    for capacity in range(111, 1000, 117):
+        m.resize_table(capacity)
+        result = True
+        for key in keys:
+            # all inserted keys must be present
+            result &= m.contains_key(str(key))
+            # NOT inserted keys must be absent
+            result &= not m.contains_key(str(key + 1))
+        print(capacity, result, m.get_size(), m.get_capacity() >= capacity)
+
+    print("\nclear and get_keys example 1")
+    print("----------------------------")
+    m = HashMap(10, hash_function_2)
+    for i in range(100, 200, 10):
+        m.put(str(i), str(i * 10))
+    print(sorted(m.get_keys()[i] for i in range(m.get_keys().length())))
+    m.clear()
+    print(m.get_size(), m.get_keys())
+
+    print("\nanagram example 1")
+    print("-----------------")
+    # Anagrams all share one hash under hash_function_1, which alone would leave them two slots between them
+    keys = [''.join(letters) for letters in itertools.islice(itertools.permutations('abcdefgh'), 500)]
+    m = HashMap(50, hash_function_1, hash_function_1)
+    for key in keys:
+        m.put(key, key)
+    print(all(m.get(key) == key for key in keys), m.get_size())
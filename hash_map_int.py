@@ -0,0 +1,323 @@
+# Description: This is a HashMap specialized for integer keys, with Open Addressing and Linear Probing. Keys and their
+# hashes live unboxed in array('q') buffers and the slot states in a bytearray, the values in a parallel DA. Keys
+# are hashed with multiply-shift into a power of two capacity, so tables of millions of IDs take a fraction of
+# the memory of HashEntry objects and can be bulk built from NumPy arrays with from_numpy().
+
+
+from array import array
+
+from helper_classes import DynamicArray
+
+
+class HashMap:
+    # Slot states kept in the bytearray parallel to the key and hash arrays
+    EMPTY = 0
+    FULL = 1
+    DELETED = 2
+    # Odd 64 bit multiplier (2^64 / golden ratio) used by the multiply-shift hash
+    MULTIPLIER = 0x9E3779B97F4A7C15
+    MAX_LOAD = 0.5
+    MIN_CAPACITY = 8
+
+    def __init__(self, capacity: int) -> None:
+        """
+        Initialize new HashMap for integer keys with at least capacity slots, rounded up to a power of two.
+        """
+        self._size = 0
+        self._allocate(self._capacity_for(capacity))
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        out = ''
+        for i in range(self._capacity):
+            entry = None
+            if self._states[i] == self.FULL:
+                entry = str(self._keys[i]) + ': ' + str(self._values[i])
+            elif self._states[i] == self.DELETED:
+                entry = 'deleted'
+            out += str(i) + ': ' + str(entry) + '\n'
+        return out
+
+    def get_size(self) -> int:
+        """Return size of map."""
+        return self._size
+
+    def get_capacity(self) -> int:
+        """Return capacity of map."""
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    @classmethod
+    def _capacity_for(cls, capacity: int) -> int:
+        """Helper method rounding capacity up to a power of two no smaller than MIN_CAPACITY."""
+        size = cls.MIN_CAPACITY
+        while size < capacity:
+            size *= 2
+        return size
+
+    @classmethod
+    def hash_key(cls, key: int) -> int:
+        """
+        Multiply-shift hash of a 64 bit integer key, kept to 63 bits so it fits an array('q').
+        The slot of a key in a table of 2^b slots is its hash's top b bits.
+        """
+        return ((key * cls.MULTIPLIER) & 0xFFFFFFFFFFFFFFFF) >> 1
+
+    def _allocate(self, capacity: int) -> None:
+        """Helper method replacing the buffers with empty ones of capacity slots, a power of two."""
+        self._capacity = capacity
+        self._shift = 63 - (capacity.bit_length() - 1)
+        self._keys = array('q', [0]) * capacity
+        self._hashes = array('q', [0]) * capacity
+        self._states = bytearray(capacity)
+        self._values = DynamicArray([None] * capacity)
+        self._deleted = 0
+
+    def _find(self, key: int, hash: int) -> int:
+        """
+        Helper method probing linearly for a key.
+
+        @param: key - the key used to search, hash - its hash
+        @return: the slot holding the key, or -1 if it is absent
+        """
+        mask = self._capacity - 1
+        slot = hash >> self._shift
+        states, keys = self._states, self._keys
+        while states[slot] != self.EMPTY:
+            if states[slot] == self.FULL and keys[slot] == key:
+                return slot
+            slot = (slot + 1) & mask
+        return -1
+
+    def _insert(self, key: int, hash: int, value: object) -> None:
+        """
+        Helper method storing a key whose hash is already known, replacing the value if the key exists.
+        Deleted slots passed on the way are reused once the key is known to be absent.
+
+        @param: key, hash - the key and its hash, value - the value for the key
+        @return: None
+        """
+        if self._size + self._deleted + 1 > self._capacity * self.MAX_LOAD:
+            # Rebuilding at the same capacity is enough when deleted slots are what fills the table
+            grow = self._size + 1 > self._capacity * self.MAX_LOAD / 2
+            self._rebuild(2 * self._capacity if grow else self._capacity)
+
+        mask = self._capacity - 1
+        slot = hash >> self._shift
+        states, keys = self._states, self._keys
+        reuse = -1
+        while states[slot] != self.EMPTY:
+            if states[slot] == self.FULL:
+                if keys[slot] == key:
+                    self._values[slot] = value
+                    return
+            elif reuse < 0:
+                reuse = slot
+            slot = (slot + 1) & mask
+
+        if reuse >= 0:
+            slot = reuse
+            self._deleted -= 1
+        states[slot] = self.FULL
+        keys[slot] = key
+        self._hashes[slot] = hash
+        self._values[slot] = value
+        self._size += 1
+
+    def _rebuild(self, new_capacity: int) -> None:
+        """Helper method moving every key into new buffers of new_capacity slots, reusing the stored hashes."""
+        keys, hashes, states, values = self._keys, self._hashes, self._states, self._values
+        self._allocate(new_capacity)
+        self._size = 0
+        for slot in range(len(states)):
+            if states[slot] == self.FULL:
+                self._insert(keys[slot], hashes[slot], values[slot])
+
+    def put(self, key: int, value: object) -> None:
+        """
+        Updates key/value pair in the hash map. If the key already exists, its value is replaced
+        with the new value, otherwise it is added on as usual.
+
+        @param: key - a signed 64 bit integer, value - the value for the corresponding key
+        @return: None
+        """
+        self._insert(key, self.hash_key(key), value)
+
+    def table_load(self) -> float:
+        """
+        Computes the load factor using the formula size/capacity
+
+        @param: None
+        @return: a floating point number indicating the load factor
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of slots without a live key.
+
+        @param: None
+        @return: an integer indicating the amount of empty buckets
+        """
+        return self._capacity - self._size
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes capacity of the hash table, rounded up to a power of two that keeps the load factor
+        under MAX_LOAD, keeping all existing key/value pairs.
+        Only works when the new_capacity >= 1 and the new_capacity is >= the current size.
+
+        @param: the new capacity of the hash table
+        @return: None
+        """
+        if new_capacity >= 1 and new_capacity >= self._size:
+            self._rebuild(self._capacity_for(max(new_capacity, int(self._size / self.MAX_LOAD) + 1)))
+
+    def get(self, key: int) -> object:
+        """
+        Returns the value associated with the given key
+
+        @param: key used to search
+        @return: the value corresponding to key, None if key is not found
+        """
+        slot = self._find(key, self.hash_key(key))
+        if slot >= 0:
+            return self._values[slot]
+
+    def contains_key(self, key: int) -> bool:
+        """
+        Checks if a given key is in the hash map.
+
+        @param: key - the key used to search
+        @return: boolean indicating if the map has the key
+        """
+        return self._find(key, self.hash_key(key)) >= 0
+
+    def remove(self, key: int) -> None:
+        """
+        Removes the given key(if found) and its associated value from the hash map.
+
+        @param: key used to search
+        @return: None
+        """
+        slot = self._find(key, self.hash_key(key))
+        if slot >= 0:
+            self._states[slot] = self.DELETED
+            self._values[slot] = None
+            self._size -= 1
+            self._deleted += 1
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map, does not change table capacity.
+
+        @param: None
+        @return: None
+        """
+        self._allocate(self._capacity)
+        self._size = 0
+
+    def get_keys(self) -> DynamicArray:
+        """
+        Returns a DA that has all the keys stored in the hash map.
+
+        @param: None
+        @return: the DA storing all the keys of hash map
+        """
+        keys_arr = DynamicArray()
+        for key, _ in self._iter_items():
+            keys_arr.append(key)
+        return keys_arr
+
+    def _iter_items(self):
+        """Generator yielding every live (key, value) pair in slot order."""
+        for slot in range(self._capacity):
+            if self._states[slot] == self.FULL:
+                yield self._keys[slot], self._values[slot]
+
+    @classmethod
+    def from_numpy(cls, keys, values=None) -> "HashMap":
+        """
+        Builds a map from a NumPy array of integer keys in one allocation. The multiply-shift hashes of
+        every key are computed vectorized, so only the probing is done key by key. Repeated keys keep
+        their last value, like repeated put() calls.
+
+        @param: keys - a NumPy array (or anything numpy.asarray accepts) of integer keys
+                values - a parallel sequence of values, as many as keys, every value is None if not given
+        @return: the new HashMap
+        """
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("HashMap.from_numpy() requires NumPy to be installed")
+
+        keys = numpy.asarray(keys, dtype=numpy.int64)
+        hashes = (keys.astype(numpy.uint64) * numpy.uint64(cls.MULTIPLIER)) >> numpy.uint64(1)
+        if values is None:
+            values = [None] * len(keys)
+        elif isinstance(values, numpy.ndarray):
+            values = values.tolist()
+        else:
+            values = list(values)
+        # zip() would silently drop the keys without a value
+        if len(values) != len(keys):
+            raise ValueError("from_numpy() got " + str(len(keys)) + " keys but " + str(len(values)) + " values")
+
+        result = cls(int(len(keys) / cls.MAX_LOAD) + 1)
+        for key, hash, value in zip(keys.tolist(), hashes.tolist(), values):
+            result._insert(key, hash, value)
+        return result
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nput example 1")
+    print("-------------")
+    m = HashMap(50)
+    for i in range(150):
+        m.put(i * 1000, i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), m.table_load(), m.get_size(), m.get_capacity())
+
+    print("\nget example 1")
+    print("-------------")
+    m = HashMap(150)
+    for i in range(200, 300, 7):
+        m.put(i, i * 10)
+    print(m.get_size(), m.get_capacity())
+    for i in range(200, 300, 21):
+        print(i, m.get(i), m.get(i) == i * 10)
+        print(i + 1, m.get(i + 1), m.get(i + 1) == (i + 1) * 10)
+
+    print("\nremove example 1")
+    print("----------------")
+    m = HashMap(50)
+    print(m.get(1))
+    m.put(1, 10)
+    m.put(-1, -10)
+    print(m.get(1), m.get(-1))
+    m.remove(1)
+    print(m.get(1), m.get(-1), m.get_size())
+    m.remove(4)
+
+    print("\nresize and clear example 1")
+    print("--------------------------")
+    m = HashMap(10)
+    for i in range(100, 200, 10):
+        m.put(i, str(i * 10))
+    m.resize_table(1)
+    print(sorted(m.get_keys()[i] for i in range(m.get_keys().length())), m.get_capacity())
+    m.clear()
+    print(m.get_size(), m.get_capacity())
+
+    print("\nfrom_numpy example 1")
+    print("--------------------")
+    try:
+        import numpy
+        m = HashMap.from_numpy(numpy.arange(0, 100000, 7), numpy.arange(0, 100000, 7) * 2)
+        print(m.get_size(), m.get(700), m.get(701), m.get_capacity())
+    except ImportError:
+        print("NumPy is not installed")
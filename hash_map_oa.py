@@ -1,11 +1,38 @@
 # Description: This is a HashMap implementation with Open Addressing and Quadratic Probing using HashEntries.
 
 
-from helper_classes import (DynamicArray, HashEntry,
-                        hash_function_1, hash_function_2)
+import itertools
+import time
+
+
+from helper_classes import (DynamicArray, EpochArray, HashEntry, HashMapMixin, keyed_hash_function, next_prime,
+                        rebind_hash_function, sized_iterable, hash_function_1, hash_function_2)
+
+
+class HashMap(HashMapMixin):
+    # Capacity policies, see set_capacity_policy()
+    EXACT = 'exact'
+    POWER_OF_TWO = 'power_of_two'
+    PRIME = 'prime'
+    _capacity_policy = EXACT
+    # Opt-in instrumentation, a MapStats instance once enable_stats() is called
+    _stats = None
+    # Opt-in collision guard, the longest probe tolerated before reseeding once enable_collision_guard() is called
+    _guard_limit = None
+    # Opt-in negative lookup filter, a CountingBloomFilter once enable_bloom_filter() is called
+    _bloom = None
+    # Tombstoned slots, kept up to date so the occupancy counts don't need a scan of the table
+    _tombstones = 0
+    # Opt-in ordered index of the keys, a SkipList once enable_sorted_index() is called
+    _sorted_index = None
+    # Opt-in timing of the hash function, a HashProfile once enable_profiling() is called
+    _profile = None
+    PROFILED_OPERATIONS = ('put', 'get', 'contains_key', 'remove', 'increment')
+    # Incremented whenever a key is added or removed or the buckets are rebuilt, so iterators can fail fast
+    _mod_count = 0
+    # Snapshot iterators still walking the current buckets, see snapshot_iter()
+    _pins = 0
 
-
-class HashMap:
     def __init__(self, capacity: int, function) -> None:
         """
         Initialize new HashMap that uses
@@ -54,17 +81,86 @@ class HashMap:
                 probe - the probe factor
                 capacity - the capacity of the current array
                 key - the key of the object we're looking to place
-        @return: the index either modified or staying the same
+        @return: the index either modified or staying the same, -1 if the collision guard gave up or
+                 the sequence started repeating without reaching the key or an empty slot
         """
         # Keep looking until we don't have a collision, then apply the quadratic probing formula
         # If statement to break if the same key is found for the replacement scenario
+        # probe ** 2 % capa repeats itself every capa steps, on capacities that aren't prime it may
+        # never visit the free slots, so give up rather than loop forever
+        # On power of two capacities, stepping by 1, 2, 3... visits the triangular numbers, which reach
+        # every slot within capa steps, and the modulo becomes a mask
+        triangular = self._capacity_policy == self.POWER_OF_TWO
+        mask = capa - 1
+        if self._stats is None and self._guard_limit is None:
+            while self._buckets[index]:
+                if self._buckets[index].key == key:
+                    return index
+                if probe > capa:
+                    return -1
+                index = (index + probe) & mask if triangular else (init_index + probe ** 2) % capa
+                probe += 1
+            return index
+
+        # Same probe, but counting the steps taken and the tombstones passed for the stats,
+        # and giving up once the collision guard's limit is reached
+        steps, tombstones = 0, 0
         while self._buckets[index]:
             if self._buckets[index].key == key:
-                return index
-            index = (init_index + probe ** 2) % capa
+                break
+            if self._buckets[index].is_tombstone is True:
+                tombstones += 1
+            if (self._guard_limit is not None and steps >= self._guard_limit) or probe > capa:
+                index = -1
+                break
+            index = (index + probe) & mask if triangular else (init_index + probe ** 2) % capa
             probe += 1
+            steps += 1
+        if self._stats is not None:
+            self._stats.record_probe(steps, tombstones)
         return index
 
+    def _find_index(self, key: str, hash: int = None, insert: bool = True) -> (int, int):
+        """
+        Helper method hashing the key and probing for either its entry or the empty slot it belongs in.
+        If the collision guard gives up on the probe, the map is rehashed with a freshly keyed hash function,
+        and if even that can't place the key the probe sequence itself is at fault, so the table is rebuilt
+        without its tombstones at a prime capacity, on which quadratic probing always reaches a free slot
+        below a 0.5 load factor. Only a key about to be placed rehashes the table, a lookup never does.
+
+        @param: key - the key to look for
+                hash - the key's hash if it is already known, it is computed otherwise
+                insert - whether the key is placed in the slot found, a lookup otherwise
+        @return: the index of the key's entry or of the slot it would be placed in, -1 for a lookup whose
+                 probe ran out of slots, which means the key is absent, and the key's hash
+        """
+        for attempt in itertools.count():
+            if hash is None:
+                hash = self._hash_function(key)
+            if self._capacity_policy == self.POWER_OF_TWO:
+                index = hash & (self._capacity - 1)
+            else:
+                index = hash % self._capacity
+            probe = 1
+            init_index = index
+
+            if not insert:
+                # Lookups never rehash, so the collision guard must not cut their probe short either
+                limit, self._guard_limit = self._guard_limit, None
+                index = self.q_probe(index, init_index, probe, self._capacity, key)
+                self._guard_limit = limit
+                return index, hash
+
+            index = self.q_probe(index, init_index, probe, self._capacity, key)
+            if index >= 0:
+                return index, hash
+            if self._guard_limit is not None:
+                self._reseed(self._capacity if attempt == 0 else next_prime(2 * self._capacity))
+            else:
+                # Sized by the live keys, tombstones left by removals would otherwise keep doubling the table
+                self.resize_table(next_prime(max(self._capacity, 2 * self._size + 1)))
+            hash = None
+
     def put(self, key: str, value: object) -> None:
         """
         Updates key/value pair in the hash map. If the key already exists, its value is replaced
@@ -74,30 +170,36 @@ class HashMap:
         @param: key - the key used to search, value - the value for the corresponding key
         @return: None
         """
+        self._put(key, value)
+
+    def _put(self, key: str, value: object, hash: int = None) -> None:
+        """Helper method doing the work of put(), reusing the key's hash if it is already known."""
         if self.table_load() >= 0.5:
             self.resize_table(2 * self._capacity)
-
-        hash = self._hash_function(key)
-        index = hash % self._capacity
-        probe = 1
-        init_index = index
+        if self._pins:
+            self._copy_buckets()
 
         # Recalculates the index
-        index = self.q_probe(index, init_index, probe, self._capacity, key)
-
-        # No collision, simply set it to a new HashEntry, increment size
-        # Otherwise, check when the current index is a tombstone, if so, set it to new HashEntry, toggle off
-        # tombstone status and increment size. If not, simply replace the value but don't increment size.
-        if not self._buckets[index]:
-            self._buckets[index] = HashEntry(key, value)
-            self._size += 1
-        else:
-            if self._buckets[index].is_tombstone is True:
-                self._buckets[index] = HashEntry(key, value)
-                self._buckets[index].is_tombstone = False
-                self._size += 1
-            elif self._buckets[index].key == key:
-                self._buckets[index].value = value
+        index, hash = self._find_index(key, hash)
+
+        # No collision or a tombstone, simply set it to a new HashEntry, increment size
+        # If not, simply replace the value but don't increment size.
+        if not self._buckets[index] or self._buckets[index].is_tombstone is True:
+            self._insert_entry(index, key, value, hash)
+        elif self._buckets[index].key == key:
+            self._buckets[index].value = value
+
+    def _insert_entry(self, index: int, key: str, value: object, hash: int) -> None:
+        """Helper method storing a new key in an empty or tombstone slot found by _find_index()."""
+        if self._buckets[index] is not None:
+            self._tombstones -= 1
+        self._buckets[index] = HashEntry(key, value, hash)
+        self._size += 1
+        self._mod_count += 1
+        if self._sorted_index is not None:
+            self._sorted_index.insert(key)
+        if self._bloom is not None:
+            self._bloom_add(key)
 
     def table_load(self) -> float:
         """
@@ -115,23 +217,25 @@ class HashMap:
         @param: None
         @return: an integer indicating the amount of empty buckets
         """
-        # Iterate count when the current index is None, or it has the tombstone status toggled on.
-        count = 0
-        for pos in range(self._buckets.length()):
-            if self._buckets[pos] is None or self._buckets[pos].is_tombstone is True:
-                count += 1
-
-        return count
+        # Every bucket that doesn't hold a live entry is either None or has the tombstone status toggled on.
+        return self._capacity - self._size
 
     def resize_table(self, new_capacity: int) -> None:
         """
         Changes capacity of the hash table, keeps all existing key/value pairs while rehashing all links.
         Only works when the new_capacity >= 1 or the new_capacity is >= the current size.
 
-        @param: the new capacity of the hash table
+        @param: the new capacity of the hash table, rounded up by the capacity policy
         @return: None
         """
         if new_capacity >= 1 and new_capacity >= self._size:
+            new_capacity = self._round_capacity(new_capacity, self._capacity_policy)
+            start = time.perf_counter() if self._stats is not None else None
+            # The Bloom filter is detached while put() re-inserts every key, then rebuilt for the new capacity,
+            # the sorted index already holds every key so it is only detached
+            bloom, self._bloom = self._bloom, None
+            sorted_index, self._sorted_index = self._sorted_index, None
+
             # stores the old bucket and its capacity into temp variables, then set to new capacity
             # and populate the new bucket with None values.
             former_table = self._buckets
@@ -144,12 +248,25 @@ class HashMap:
 
             # References buckets to the new buckets, reset size
             # Loop through and put the old table's elements that are not none or has False for tombstone
-            # status into the new bucket, rehashing and updating size is done within put().
+            # status into the new bucket, updating size is done within put(), which reuses the cached hashes
+            # unless the collision guard reseeded the hash function part way through.
             self._buckets = new_buckets
             self._size = 0
+            self._tombstones = 0
+            self._mod_count += 1
+            self._pins = 0
+            function = self._hash_function
             for pos in range(former_capa):
                 if former_table[pos] and former_table[pos].is_tombstone is False:
-                    self.put(former_table[pos].key, former_table[pos].value)
+                    hash = former_table[pos].hash if self._hash_function is function else None
+                    self._put(former_table[pos].key, former_table[pos].value, hash)
+
+            if bloom is not None:
+                self._bloom = bloom
+                self._rebuild_bloom()
+            self._sorted_index = sorted_index
+            if start is not None:
+                self._stats.record_resize(former_capa, new_capacity, time.perf_counter() - start)
 
     def get(self, key: str) -> object:
         """
@@ -158,16 +275,18 @@ class HashMap:
         @param: key used to search
         @return: the value corresponding to key, None if key is not found
         """
-        hash = self._hash_function(key)
-        index = hash % self._capacity
-        probe = 1
-        init_index = index
+        if self._bloom is not None and not self._bloom.might_contain(key):
+            return None
 
-        # Recalculates index if there was a collision when placing the value
-        index = self.q_probe(index, init_index, probe, self._capacity, key)
+        # Recalculates index if there was a collision when placing the value, the probe stops either
+        # on the key's entry or on an empty slot, so a single probe is enough to answer the lookup
+        index = self._find_index(key, insert=False)[0]
+        if index < 0:
+            return None
 
-        if self.contains_key(key):
-            return self._buckets[index].value
+        entry = self._buckets[index]
+        if entry and entry.is_tombstone is False:
+            return entry.value
 
     def contains_key(self, key: str) -> bool:
         """
@@ -176,12 +295,16 @@ class HashMap:
         @param: key - the key used to search
         @return: boolean indicating if the chain has the key
         """
-        # Extra condition to ensure that the tombstone value has to be toggled off before returning true.
-        for pos in range(self._capacity):
-            if self._buckets[pos] and self._buckets[pos].key == key and self._buckets[pos].is_tombstone is False:
-                return True
+        if self._bloom is not None and not self._bloom.might_contain(key):
+            return False
+
+        index = self._find_index(key, insert=False)[0]
+        if index < 0:
+            return False
 
-        return False
+        # Extra condition to ensure that the tombstone value has to be toggled off before returning true.
+        entry = self._buckets[index]
+        return True if entry and entry.is_tombstone is False else False
 
     def remove(self, key: str) -> None:
         """
@@ -190,29 +313,50 @@ class HashMap:
         @param: key used to search
         @return: None
         """
-        hash = self._hash_function(key)
-        index = hash % self._capacity
-        probe = 1
-        init_index = index
+        if self._bloom is not None and not self._bloom.might_contain(key):
+            return
 
-        index = self.q_probe(index, init_index, probe, self._capacity, key)
+        index = self._find_index(key, insert=False)[0]
+        if index < 0:
+            return
+        if self._pins:
+            self._copy_buckets()
 
         # toggles tombstone status and decrements the size
         if self._buckets[index] and self._buckets[index].key == key and self._buckets[index].is_tombstone is False:
             self._buckets[index].is_tombstone = True
             self._size -= 1
+            self._tombstones += 1
+            self._mod_count += 1
+            if self._sorted_index is not None:
+                self._sorted_index.remove(key)
+            if self._bloom is not None:
+                self._bloom.remove(key)
 
     def clear(self) -> None:
         """
         Clears the contents of the hash map, does not change table capacity.
+        The buckets are generation stamped, so after the first call the table is cleared in O(1)
+        and each bucket only reads as None again the next time it is probed.
 
         @param: None
         @return: None
         """
-        # Loops through to set every value to None in buckets, then resets the current size to 0
-        for pos in range(self._capacity):
-            self._buckets[pos] = None
+        # The first clear swaps the buckets for an EpochArray, later ones just start a new generation
+        # unless a snapshot iterator is still walking the buckets, which then keeps them,
+        # then resets the current size to 0
+        if isinstance(self._buckets, EpochArray) and not self._pins:
+            self._buckets.reset()
+        else:
+            self._buckets = EpochArray(self._capacity)
+            self._pins = 0
         self._size = 0
+        self._tombstones = 0
+        self._mod_count += 1
+        if self._bloom is not None:
+            self._bloom.clear()
+        if self._sorted_index is not None:
+            self._sorted_index.clear()
 
     def get_keys(self) -> DynamicArray:
         """
@@ -229,6 +373,284 @@ class HashMap:
 
         return keys_arr
 
+    def increment(self, key: str, delta: int = 1) -> int:
+        """
+        Adds delta to the count stored under the given key, starting from 0 if the key is absent.
+        Only hashes and probes once, unlike a contains_key/get/put round trip.
+
+        @param: key - the key whose count is updated
+                delta - the amount added to the count
+        @return: the updated count
+        """
+        if self.table_load() >= 0.5:
+            self.resize_table(2 * self._capacity)
+        if self._pins:
+            self._copy_buckets()
+
+        index, hash = self._find_index(key)
+
+        # Update the live entry in place, otherwise the slot is empty or a tombstone of the same key
+        entry = self._buckets[index]
+        if entry and entry.is_tombstone is False:
+            entry.value += delta
+            return entry.value
+
+        self._insert_entry(index, key, delta, hash)
+        return delta
+
+    def update(self, other: "HashMap", resolve=None) -> None:
+        """
+        Merges every key/value pair of other into this map, resizing at most once up front.
+        When both maps share a hash function, the hashes cached in other's entries are reused.
+
+        @param: other - the map to merge in
+                resolve - optional callback(key, this_value, other_value) returning the value to keep for
+                          keys in both maps, other's value wins if not given
+        @return: None
+        """
+        self.reserve(self._size + other._size)
+        self._merge_from(other, resolve)
+
+    def union(self, other: "HashMap", resolve=None) -> "HashMap":
+        """
+        Returns a new map holding the pairs of both maps, sized once for all of them.
+
+        @param: other - the map to combine with
+                resolve - optional callback(key, this_value, other_value) returning the value to keep for
+                          keys in both maps, other's value wins if not given
+        @return: a new HashMap using this map's hash function
+        """
+        result = self._with_capacity(self._size + other._size, self._hash_function, self._capacity_policy)
+        result._merge_from(self)
+        result._merge_from(other, resolve)
+        return result
+
+    def intersection(self, other: "HashMap", resolve=None) -> "HashMap":
+        """
+        Returns a new map holding the keys found in both maps, walking the smaller map's buckets
+        and looking each key up in the larger one.
+
+        @param: other - the map to intersect with
+                resolve - optional callback(key, this_value, other_value) returning the value to keep,
+                          this map's value is kept if not given
+        @return: a new HashMap using this map's hash function
+        """
+        small, large = (self, other) if self._size <= other._size else (other, self)
+        result = self._with_capacity(small._size, self._hash_function, self._capacity_policy)
+        for entry in small._iter_entries():
+            match = large._find_entry(entry, small)
+            if match is None:
+                continue
+            mine, theirs = (entry, match) if small is self else (match, entry)
+            value = resolve(entry.key, mine.value, theirs.value) if resolve is not None else mine.value
+            result._merge_pair(mine.key, value, mine.hash)
+        return result
+
+    def difference(self, other: "HashMap") -> "HashMap":
+        """
+        Returns a new map holding the pairs of this map whose keys are not in other.
+
+        @param: other - the map whose keys are left out
+        @return: a new HashMap using this map's hash function
+        """
+        result = self._with_capacity(self._size, self._hash_function, self._capacity_policy)
+        for entry in self._iter_entries():
+            if other._find_entry(entry, self) is None:
+                result._merge_pair(entry.key, entry.value, entry.hash)
+        return result
+
+    def reserve(self, size: int) -> None:
+        """
+        Grows the table once so that size keys fit without put() resizing, keeping the load factor under 0.5.
+        Does nothing if the table is already large enough.
+
+        @param: size - the amount of keys the map should hold
+        @return: None
+        """
+        needed = self._capacity_for(size, self._capacity_policy)
+        if needed > self._capacity:
+            self.resize_table(needed)
+
+    @classmethod
+    def from_iterable(cls, pairs, expected_size: int = None, function=hash_function_2,
+                      policy: str = None) -> "HashMap":
+        """
+        Builds a map from key/value pairs with a single allocation of the right capacity and no resizes.
+
+        @param: pairs - an iterable (or DynamicArray) of (key, value) pairs, later pairs win for repeated keys
+                expected_size - the amount of pairs, taken from pairs when it has a length, or counted otherwise
+                function - the hash function of the new map
+                policy - the capacity policy of the new map, EXACT if not given
+        @return: the new HashMap
+        """
+        pairs, size = sized_iterable(pairs, expected_size)
+        result = cls._with_capacity(size, function, policy or cls._capacity_policy)
+        for key, value in pairs:
+            result.put(key, value)
+        return result
+
+    @classmethod
+    def from_keys(cls, keys, value: object = None, expected_size: int = None, function=hash_function_2,
+                  policy: str = None) -> "HashMap":
+        """
+        Builds a map storing the same value under every key, with a single allocation of the right capacity.
+
+        @param: keys - an iterable (or DynamicArray) of keys
+                value - the value stored under every key
+                expected_size, function, policy - as in from_iterable()
+        @return: the new HashMap
+        """
+        keys, size = sized_iterable(keys, expected_size)
+        return cls.from_iterable(((key, value) for key in keys), size, function, policy)
+
+    @classmethod
+    def _with_capacity(cls, size: int, function, policy: str) -> "HashMap":
+        """Helper method building an empty map whose first allocation already holds size keys."""
+        result = cls(cls._capacity_for(size, policy), function)
+        if policy != result._capacity_policy:
+            result._capacity_policy = policy
+        return result
+
+    @classmethod
+    def _capacity_for(cls, size: int, policy: str) -> int:
+        """Helper method returning the smallest capacity that holds size keys without put() resizing."""
+        return cls._round_capacity(max(1, 2 * size), policy)
+
+    def set_capacity_policy(self, policy: str) -> None:
+        """
+        Chooses how capacities are rounded and probed, and resizes the table to follow the new policy.
+        EXACT keeps the requested capacities with quadratic probing, as the map always did.
+        POWER_OF_TWO rounds capacities up to powers of two, indexes with a bitmask and probes by
+        triangular numbers, which is the fastest and always reaches a free slot, but only uses the
+        low bits of the hash. PRIME rounds capacities up to primes and probes quadratically, which
+        suits weak hash functions such as hash_function_1 whose low bits are poorly mixed.
+
+        @param: policy - EXACT, POWER_OF_TWO or PRIME
+        @return: None
+        """
+        if policy not in (self.EXACT, self.POWER_OF_TWO, self.PRIME):
+            raise ValueError("unknown capacity policy: " + str(policy))
+        self._capacity_policy = policy
+
+        # Rebuild even when the capacity doesn't change, the slots depend on the probing scheme
+        self.resize_table(self._capacity)
+
+    @classmethod
+    def _round_capacity(cls, capacity: int, policy: str) -> int:
+        """Helper method rounding a capacity up according to a capacity policy."""
+        if policy == cls.POWER_OF_TWO:
+            return 1 << (capacity - 1).bit_length()
+        if policy == cls.PRIME:
+            return next_prime(capacity)
+        return capacity
+
+    def _iter_entries(self):
+        """Generator yielding every live HashEntry in bucket order."""
+        for pos in range(self._capacity):
+            entry = self._buckets[pos]
+            if entry and entry.is_tombstone is False:
+                yield entry
+
+    def _find_entry(self, entry: HashEntry, source: "HashMap") -> HashEntry:
+        """
+        Helper method looking up the key of an entry from source, reusing its cached hash
+        when source hashes with the same function.
+
+        @return: this map's live entry for the key, None if absent
+        """
+        hash = entry.hash if source._hash_function is self._hash_function else None
+        index = self._find_index(entry.key, hash, insert=False)[0]
+        match = self._buckets[index] if index >= 0 else None
+        return match if match and match.is_tombstone is False else None
+
+    def _merge_from(self, other: "HashMap", resolve=None) -> None:
+        """Helper method putting every pair of other into this map, reusing cached hashes when possible."""
+        for entry in other._iter_entries():
+            # Checked for every entry, the collision guard may reseed this map part way through
+            reuse = other._hash_function is self._hash_function
+            self._merge_pair(entry.key, entry.value, entry.hash if reuse else None, resolve)
+
+    def _merge_pair(self, key: str, value: object, hash: int = None, resolve=None) -> None:
+        """Helper method putting one pair, calling resolve(key, this_value, value) if the key already exists."""
+        if self.table_load() >= 0.5:
+            self.resize_table(2 * self._capacity)
+        if self._pins:
+            self._copy_buckets()
+
+        index, hash = self._find_index(key, hash)
+        entry = self._buckets[index]
+        if entry and entry.is_tombstone is False:
+            entry.value = resolve(key, entry.value, value) if resolve is not None else value
+        else:
+            self._insert_entry(index, key, value, hash)
+
+    def enable_collision_guard(self, limit: int = 16) -> None:
+        """
+        Starts watching probe lengths for collision attacks. Whenever a probe would take more than
+        limit steps, the map switches to a freshly keyed hash function and rehashes every entry, which
+        brings the adversarial keys back to O(1) probes.
+
+        @param: limit - the longest probe tolerated before reseeding
+        @return: None
+        """
+        self._guard_limit = limit
+
+    def _reseed(self, new_capacity: int) -> None:
+        """Helper method switching to a freshly keyed hash function and rehashing into new_capacity buckets."""
+        limit = self._guard_limit
+        if self._stats is not None:
+            self._stats.record_reseed(limit)
+
+        # The cached hashes belong to the old function, and the guard is off while rehashing
+        # so the rehash can't trigger another reseed
+        for pos in range(self._capacity):
+            if self._buckets[pos]:
+                self._buckets[pos].hash = None
+        self._guard_limit = None
+        self._hash_function = rebind_hash_function(self._hash_function, keyed_hash_function())
+        self.resize_table(new_capacity)
+        self._guard_limit = limit
+
+    def occupancy(self) -> dict:
+        """
+        Returns the counts of live entries, never used (None) buckets and tombstones,
+        all kept up to date incrementally.
+
+        @param: None
+        @return: a dict with the 'live', 'empty' and 'tombstones' counts
+        """
+        return {'live': self._size, 'empty': self._capacity - self._size - self._tombstones,
+                'tombstones': self._tombstones}
+
+    def _iter_pinned(self, buckets: DynamicArray):
+        """Generator walking pinned buckets, unpinning them once done if the map still uses them."""
+        try:
+            for pos in range(buckets.length()):
+                entry = buckets[pos]
+                if entry and entry.is_tombstone is False:
+                    yield entry.key, entry.value
+        finally:
+            if buckets is self._buckets:
+                self._pins -= 1
+
+    def _copy_buckets(self) -> None:
+        """Helper method giving the map its own copy of the buckets, and entries, a snapshot iterator has pinned."""
+        buckets = DynamicArray()
+        for pos in range(self._capacity):
+            entry = self._buckets[pos]
+            if entry is not None:
+                copy = HashEntry(entry.key, entry.value, entry.hash)
+                copy.is_tombstone = entry.is_tombstone
+                entry = copy
+            buckets.append(entry)
+        self._buckets = buckets
+        self._pins = 0
+
+    def _iter_items(self):
+        """Generator yielding every live (key, value) pair in bucket order."""
+        for entry in self._iter_entries():
+            yield entry.key, entry.value
+
 
 # ------------------- BASIC TESTING ---------------------------------------- #
 
@@ -418,3 +840,157 @@ if __name__ == "__main__":
     m.remove('100')
     m.resize_table(2)
     print(m.get_keys())
+
+    print("\nincrement example 1")
+    print("-------------------")
+    m = HashMap(10, hash_function_2)
+    m.add_many(['a', 'b', 'a', 'c', 'a', 'b'])
+    print(m.increment('c', 5), m.increment('d'), m.get('a'), m.get_size())
+    print(m.most_common(2))
+
+    print("\nstats example 1")
+    print("---------------")
+    m = HashMap(10, hash_function_1)
+    m.enable_stats()
+    for i in range(20):
+        m.put('key' + str(i), i)
+    m.resize_table(40)
+    stats = m.stats()
+    print(stats['collisions'], len(stats['resizes']), stats['resizes'][-1]['new_capacity'])
+
+    print("\ncollision guard example 1")
+    print("-------------------------")
+    # Anagrams all share one hash under hash_function_1, so without the guard every insert probes past
+    # all the earlier ones (and may never find a free slot), with it probes stay short
+    keys = [''.join(letters) for letters in itertools.islice(itertools.permutations('abcdefgh'), 500)]
+    m = HashMap(50, hash_function_1)
+    m.enable_collision_guard()
+    m.enable_stats()
+    for key in keys:
+        m.put(key, key)
+    result = all(m.get(key) == key for key in keys)
+    print(result, m.get_size(), m.stats()['reseeds'] > 0, len(m.stats()['probe_lengths']) <= 17)
+
+    print("\nbloom filter example 1")
+    print("----------------------")
+    m = HashMap(50, hash_function_2)
+    m.enable_bloom_filter()
+    for i in range(200):
+        m.put('key' + str(i), i)
+    for i in range(0, 200, 2):
+        m.remove('key' + str(i))
+    result = all(m.get('key' + str(i)) == (i if i % 2 else None) for i in range(200))
+    result &= not any(m.contains_key('miss' + str(i)) for i in range(200))
+    m.clear()
+    print(result, m.get_size(), m.contains_key('key1'))
+
+    print("\nset operations example 1")
+    print("------------------------")
+    a = HashMap(10, hash_function_2)
+    b = HashMap(10, hash_function_2)
+    for i in range(10):
+        a.put('key' + str(i), i)
+        b.put('key' + str(i + 5), 10 * (i + 5))
+    print(sorted(a.union(b).get_keys()[i] for i in range(15)))
+    both = a.intersection(b, lambda key, mine, theirs: mine + theirs)
+    print(both.get_size(), both.get('key5'), both.get('key9'), both.get('key0'))
+    print(a.difference(b).get_size(), a.difference(b).contains_key('key5'))
+    a.update(b, lambda key, mine, theirs: max(mine, theirs))
+    print(a.get_size(), a.get('key5'), a.get('key14'), a.get('key0'))
+
+    print("\ncapacity policy example 1")
+    print("-------------------------")
+    for policy in (HashMap.EXACT, HashMap.POWER_OF_TWO, HashMap.PRIME):
+        m = HashMap(50, hash_function_2)
+        m.set_capacity_policy(policy)
+        for i in range(150):
+            m.put('str' + str(i), i * 100)
+        result = all(m.get('str' + str(i)) == i * 100 for i in range(150))
+        result &= not any(m.contains_key('str' + str(i)) for i in range(150, 300))
+        print(policy, result, m.get_size(), m.get_capacity())
+
+    print("\nfrom_iterable example 1")
+    print("-----------------------")
+    m = HashMap.from_iterable(('key' + str(i), i) for i in range(100))
+    print(m.get_size(), m.get_capacity(), m.get('key42'))
+    m = HashMap.from_keys(DynamicArray(['a', 'b', 'c']), 0, policy=HashMap.POWER_OF_TWO)
+    print(m.get_size(), m.get_capacity(), m.get('b'))
+    m.reserve(100)
+    print(m.get_size(), m.get_capacity(), m.get('b'))
+
+    print("\nclear example 3")
+    print("---------------")
+    # Reusing a scratch map, every clear after the first is O(1)
+    m = HashMap(100, hash_function_1)
+    for rounds in range(3):
+        for i in range(rounds * 10, rounds * 10 + 20):
+            m.put('key' + str(i), i)
+        m.remove('key' + str(rounds * 10 + 1))
+        print(m.get_size(), m.empty_buckets(), m.occupancy(), m.get('key' + str(rounds * 10)), m.get('key0'))
+        m.clear()
+    print(m.get_size(), m.empty_buckets(), m.get_keys())
+
+    print("\nsorted index example 1")
+    print("----------------------")
+    m = HashMap(20, hash_function_2)
+    m.enable_sorted_index()
+    for word in ['pear', 'apple', 'peach', 'plum', 'apricot', 'banana', 'pea']:
+        m.put(word, len(word))
+    m.remove('plum')
+    print(list(m.sorted_keys()))
+    print(list(m.range('b', 'pea')), list(m.range('peach')), list(m.prefix('pea')), list(m.prefix('ap')))
+    m.resize_table(50)
+    m.put('cherry', 6)
+    print(list(m.range('b', 'd')), m.get_size())
+    m.clear()
+    print(list(m.sorted_keys()), list(m.prefix('p')))
+
+    print("\nhash memo and profiling example 1")
+    print("---------------------------------")
+    # An expensive hash function dominates the operations until hot keys are memoized
+    def slow_hash(key: str) -> int:
+        return hash_function_2(key * 200)
+
+    m = HashMap(100, slow_hash)
+    m.enable_profiling()
+    hot = ['key' + str(i) for i in range(10)]
+    for _ in range(100):
+        for key in hot:
+            m.put(key, m.get(key) or 0)
+    before = m.profile()
+    # The memo's sets are picked by the built-in hash, which is randomized per run, so a few hot keys
+    # may share a set and keep evicting each other
+    m.enable_hash_memo()
+    memo = m._hash_function
+    m.disable_profiling()
+    m.enable_profiling()
+    for _ in range(100):
+        for key in hot:
+            m.put(key, m.get(key) + 1)
+    after = m.profile()
+    print(before['operations'], before['hash_calls'], before['hash_share'] > 0.5)
+    print(after['operations'], after['memo_misses'] < 500, after['memo_hits'] > 1500, m.get('key3'))
+    m.disable_profiling()
+    # The memo, and what it cached, outlives the profiling it was put around
+    print(m._hash_function is memo, memo.hits > 1900)
+    m.disable_hash_memo()
+    print(m.profile(), m.get('key3'), m._hash_function is slow_hash)
+
+    print("\nsnapshot_iter example 1")
+    print("-----------------------")
+    m = HashMap(10, hash_function_2)
+    for i in range(4):
+        m.put('key' + str(i), i)
+    try:
+        for key in m.keys():
+            m.put(key, -1)
+            m.put('new key', 100)
+    except RuntimeError as error:
+        print(error)
+    snapshot = m.snapshot_iter()
+    m.put('key0', 0)
+    m.remove('key1')
+    m.increment('key2', 10)
+    m.resize_table(50)
+    print(sorted(snapshot))
+    print(sorted(m.items()))
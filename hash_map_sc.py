@@ -1,11 +1,32 @@
 # Description: This is a HashMap implementation using chaining with the help of the LinkedList class.
 
 
-from helper_classes import (DynamicArray, LinkedList,
-                            hash_function_1, hash_function_2)
+import itertools
+import time
+
+from helper_classes import (DynamicArray, EpochArray, HashMapMixin, LinkedList, keyed_hash_function,
+                            rebind_hash_function, sized_iterable, hash_function_1, hash_function_2)
+
+
+class HashMap(HashMapMixin):
+    # Opt-in instrumentation, a MapStats instance once enable_stats() is called
+    _stats = None
+    # Opt-in collision guard, the chain length tolerated before reseeding once enable_collision_guard() is called
+    _guard_limit = None
+    # Opt-in negative lookup filter, a CountingBloomFilter once enable_bloom_filter() is called
+    _bloom = None
+    # Buckets holding at least one node, kept up to date so empty_buckets() doesn't scan the table
+    _occupied = 0
+    # Opt-in ordered index of the keys, a SkipList once enable_sorted_index() is called
+    _sorted_index = None
+    # Opt-in timing of the hash function, a HashProfile once enable_profiling() is called
+    _profile = None
+    PROFILED_OPERATIONS = ('put', 'get', 'contains_key', 'remove', 'increment')
+    # Incremented whenever a key is added or removed or the buckets are rebuilt, so iterators can fail fast
+    _mod_count = 0
+    # Snapshot iterators still walking the current buckets, see snapshot_iter()
+    _pins = 0
 
-
-class HashMap:
     def __init__(self, capacity: int, function) -> None:
         """
         Initialize new HashMap that uses
@@ -56,17 +77,37 @@ class HashMap:
                 value - if the key is found, inserted into the entry along with key
         @return: None
         """
+        if self._pins:
+            self._copy_buckets()
         hash = self._hash_function(key)
         index = hash % self._capacity
-        entry = self._buckets[index]
+        entry = self._writable_chain(index)
 
         # Checks if the key is already in the entry, updates size(or not) accordingly
-        if entry.contains(key):
-            entry.remove(key)
-            entry.insert(key, value)
+        # The value is replaced in place, so iterators walking the chain aren't disturbed
+        node = entry.contains(key)
+        if node:
+            if self._stats is not None:
+                self._stats.record_chain(entry.length())
+            node.value = value
         else:
-            entry.insert(key, value)
-            self._size += 1
+            if self._stats is not None:
+                self._stats.record_chain(entry.length(), True)
+            self._insert_node(entry, key, value)
+
+    def _insert_node(self, chain: LinkedList, key: str, value: object) -> None:
+        """Helper method adding a key that isn't in the map yet to the front of its chain."""
+        if chain.length() == 0:
+            self._occupied += 1
+        chain.insert(key, value)
+        self._size += 1
+        self._mod_count += 1
+        if self._sorted_index is not None:
+            self._sorted_index.insert(key)
+        if self._bloom is not None:
+            self._bloom_add(key)
+        if self._guard_limit is not None:
+            self._check_chain(chain)
 
     def empty_buckets(self) -> int:
         """
@@ -75,13 +116,8 @@ class HashMap:
         @param: None
         @return: an integer indicating the amount of empty buckets
         """
-        # Initialize a counter and go through each bucket, increment when the bucket's LL has a length of 0.
-        count = 0
-        for pos in range(self.get_capacity()):
-            if self._buckets[pos].length() == 0:
-                count += 1
-
-        return count
+        # Inserts and removals keep count of the buckets whose LL isn't empty, so no scan is needed.
+        return self._capacity - self._occupied
 
     def table_load(self) -> float:
         """
@@ -95,14 +131,26 @@ class HashMap:
     def clear(self) -> None:
         """
         Clears the contents of the hash map, does not change table capacity.
+        The buckets are generation stamped, so after the first call the table is cleared in O(1)
+        and each bucket is only replaced by an empty LL the next time a key is written to it.
 
         @param: None
         @return: None
         """
-        # Loop through and set each bucket to an empty LL and resetting the size
-        for pos in range(self.get_capacity()):
-            self._buckets[pos] = LinkedList()
-            self._size = 0
+        # The first clear swaps the buckets for an EpochArray, later ones just start a new generation
+        # unless a snapshot iterator is still walking the buckets, which then keeps them
+        if isinstance(self._buckets, EpochArray) and not self._pins:
+            self._buckets.reset()
+        else:
+            self._buckets = EpochArray(self._capacity, LinkedList)
+            self._pins = 0
+        self._size = 0
+        self._mod_count += 1
+        self._occupied = 0
+        if self._bloom is not None:
+            self._bloom.clear()
+        if self._sorted_index is not None:
+            self._sorted_index.clear()
 
     def resize_table(self, new_capacity: int) -> None:
         """
@@ -117,6 +165,11 @@ class HashMap:
         # size. Iterate through old table and call put() to rehash key/value pairs into the new bucket, which also
         # updates the current size.
         if new_capacity > 0:
+            start = time.perf_counter() if self._stats is not None else None
+            # The Bloom filter is detached while put() re-inserts every key, then rebuilt for the new capacity,
+            # the sorted index already holds every key so it is only detached
+            bloom, self._bloom = self._bloom, None
+            sorted_index, self._sorted_index = self._sorted_index, None
             former_table = self._buckets
             former_capa = self._capacity
             self._capacity = new_capacity
@@ -126,11 +179,21 @@ class HashMap:
 
             self._buckets = new_buckets
             self._size = 0
+            self._occupied = 0
+            self._mod_count += 1
+            self._pins = 0
             for pos in range(former_capa):
                 if former_table[pos] is not None:
                     for node in former_table[pos]:
                         self.put(node.key, node.value)
 
+            if bloom is not None:
+                self._bloom = bloom
+                self._rebuild_bloom()
+            self._sorted_index = sorted_index
+            if start is not None:
+                self._stats.record_resize(former_capa, new_capacity, time.perf_counter() - start)
+
     def get(self, key: str) -> object:
         """
         Returns the value associated with the given key.
@@ -138,10 +201,18 @@ class HashMap:
         @param: the key used to search
         @return: the value of the object, None if the key is not found
         """
-        if self.contains_key(key):
-            hash = self._hash_function(key)
-            index = hash % self._capacity
-            return self._buckets[index].contains(key).value
+        if self._bloom is not None and not self._bloom.might_contain(key):
+            return None
+
+        hash = self._hash_function(key)
+        index = hash % self._capacity
+        chain = self._buckets[index]
+        if self._stats is not None:
+            self._stats.record_chain(chain.length())
+
+        node = chain.contains(key)
+        if node:
+            return node.value
 
     def contains_key(self, key: str) -> bool:
         """
@@ -150,9 +221,14 @@ class HashMap:
         @param: key - the key used to search
         @return: boolean indicating if the chain has the key
         """
+        if self._bloom is not None and not self._bloom.might_contain(key):
+            return False
+
         hash = self._hash_function(key)
         index = hash % self._capacity
         chain = self._buckets[index]
+        if self._stats is not None:
+            self._stats.record_chain(chain.length())
 
         return True if chain.contains(key) else False
 
@@ -163,12 +239,26 @@ class HashMap:
         @param: key used to search
         @return: None
         """
+        if self._bloom is not None and not self._bloom.might_contain(key):
+            return
+
+        if self._pins:
+            self._copy_buckets()
         hash = self._hash_function(key)
         index = hash % self._capacity
+        if self._stats is not None:
+            self._stats.record_chain(self._buckets[index].length())
 
         if self._buckets[index].contains(key):
             self._buckets[index].remove(key)
             self._size -= 1
+            self._mod_count += 1
+            if self._buckets[index].length() == 0:
+                self._occupied -= 1
+            if self._sorted_index is not None:
+                self._sorted_index.remove(key)
+            if self._bloom is not None:
+                self._bloom.remove(key)
 
     def get_keys(self) -> DynamicArray:
         """
@@ -183,6 +273,242 @@ class HashMap:
                 result_keys.append(node.key)
         return result_keys
 
+    def increment(self, key: str, delta: int = 1) -> int:
+        """
+        Adds delta to the count stored under the given key, starting from 0 if the key is absent.
+        Only hashes the key and walks its chain once, unlike a contains_key/get/put round trip.
+
+        @param: key - the key whose count is updated
+                delta - the amount added to the count
+        @return: the updated count
+        """
+        if self._pins:
+            self._copy_buckets()
+        hash = self._hash_function(key)
+        index = hash % self._capacity
+        chain = self._writable_chain(index)
+
+        # Update the node in place if it exists, otherwise start a new count at the front of the chain
+        node = chain.contains(key)
+        if self._stats is not None:
+            self._stats.record_chain(chain.length(), node is None)
+        if node:
+            node.value += delta
+            return node.value
+
+        self._insert_node(chain, key, delta)
+        return delta
+
+    def update(self, other: "HashMap", resolve=None) -> None:
+        """
+        Merges every key/value pair of other into this map. When both maps share a hash function and
+        capacity, each of other's buckets is merged straight into the matching bucket without hashing.
+
+        @param: other - the map to merge in
+                resolve - optional callback(key, this_value, other_value) returning the value to keep for
+                          keys in both maps, other's value wins if not given
+        @return: None
+        """
+        self._merge_from(other, resolve)
+
+    def union(self, other: "HashMap", resolve=None) -> "HashMap":
+        """
+        Returns a new map holding the pairs of both maps, sized once for all of them. While that fits in
+        this map's capacity the result shares it, so this map's buckets are copied over without hashing.
+
+        @param: other - the map to combine with
+                resolve - optional callback(key, this_value, other_value) returning the value to keep for
+                          keys in both maps, other's value wins if not given
+        @return: a new HashMap
+        """
+        result = HashMap(max(self._capacity, self._size + other._size), self._hash_function)
+        result._merge_from(self)
+        result._merge_from(other, resolve)
+        return result
+
+    def intersection(self, other: "HashMap", resolve=None) -> "HashMap":
+        """
+        Returns a new map holding the keys found in both maps, walking the smaller map's buckets
+        and looking each key up in the larger one. The result is sized for the smaller map's keys.
+
+        @param: other - the map to intersect with
+                resolve - optional callback(key, this_value, other_value) returning the value to keep,
+                          this map's value is kept if not given
+        @return: a new HashMap sharing this map's hash function, with at least this map's capacity
+        """
+        small, large = (self, other) if self._size <= other._size else (other, self)
+        result = HashMap(max(self._capacity, small._size), self._hash_function)
+        aligned = self._aligned(other)
+        direct = result._aligned(small)
+        for pos in range(small._capacity):
+            for node in small._buckets[pos]:
+                # Matching buckets hold the same keys when the maps are aligned, otherwise look the key up
+                match = (large._buckets[pos] if aligned else large._chain(node.key)).contains(node.key)
+                if match is None:
+                    continue
+
+                mine, theirs = (node, match) if small is self else (match, node)
+                value = resolve(node.key, mine.value, theirs.value) if resolve is not None else mine.value
+                chain = result._buckets[pos] if direct else result._chain(node.key)
+                result._insert_node(chain, node.key, value)
+        return result
+
+    def difference(self, other: "HashMap") -> "HashMap":
+        """
+        Returns a new map holding the pairs of this map whose keys are not in other.
+
+        @param: other - the map whose keys are left out
+        @return: a new HashMap sharing this map's hash function, with at least this map's capacity
+                 and a bucket for each of its keys
+        """
+        result = HashMap(max(self._capacity, self._size), self._hash_function)
+        aligned = self._aligned(other)
+        direct = result._aligned(self)
+        for pos in range(self._capacity):
+            for node in self._buckets[pos]:
+                if not (other._buckets[pos] if aligned else other._chain(node.key)).contains(node.key):
+                    chain = result._buckets[pos] if direct else result._chain(node.key)
+                    result._insert_node(chain, node.key, node.value)
+        return result
+
+    def reserve(self, size: int) -> None:
+        """
+        Grows the table once so that size keys fit at a load factor of at most 1, i.e. one bucket per key.
+        Does nothing if the table is already large enough, put() itself never resizes the table.
+
+        @param: size - the amount of keys the map should hold
+        @return: None
+        """
+        if size > self._capacity:
+            self.resize_table(size)
+
+    @classmethod
+    def from_iterable(cls, pairs, expected_size: int = None, function=hash_function_2) -> "HashMap":
+        """
+        Builds a map from key/value pairs with a single allocation of one bucket per pair.
+
+        @param: pairs - an iterable (or DynamicArray) of (key, value) pairs, later pairs win for repeated keys
+                expected_size - the amount of pairs, taken from pairs when it has a length, or counted otherwise
+                function - the hash function of the new map
+        @return: the new HashMap
+        """
+        pairs, size = sized_iterable(pairs, expected_size)
+        result = cls(max(1, size), function)
+        for key, value in pairs:
+            result.put(key, value)
+        return result
+
+    @classmethod
+    def from_keys(cls, keys, value: object = None, expected_size: int = None, function=hash_function_2) -> "HashMap":
+        """
+        Builds a map storing the same value under every key, with a single allocation of one bucket per key.
+
+        @param: keys - an iterable (or DynamicArray) of keys
+                value - the value stored under every key
+                expected_size, function - as in from_iterable()
+        @return: the new HashMap
+        """
+        keys, size = sized_iterable(keys, expected_size)
+        return cls.from_iterable(((key, value) for key in keys), size, function)
+
+    def _aligned(self, other: "HashMap") -> bool:
+        """Helper method checking whether every key sits in the same bucket index in both maps."""
+        return other._hash_function is self._hash_function and other._capacity == self._capacity
+
+    def _chain(self, key: str) -> LinkedList:
+        """Helper method returning the chain a key hashes to."""
+        return self._buckets[self._hash_function(key) % self._capacity]
+
+    def _writable_chain(self, index: int) -> LinkedList:
+        """
+        Helper method returning the chain at index for a key to be written to. Cleared buckets all read as
+        one shared empty chain, so a bucket only gets a chain of its own once a key is written to it.
+        """
+        if isinstance(self._buckets, EpochArray):
+            return self._buckets.get_writable(index)
+        return self._buckets[index]
+
+    def _merge_from(self, other: "HashMap", resolve=None) -> None:
+        """Helper method putting every pair of other into this map, bucket by bucket when the maps are aligned."""
+        if self._pins:
+            self._copy_buckets()
+        for pos in range(other._capacity):
+            for node in other._buckets[pos]:
+                # Checked for every node, the collision guard may reseed this map part way through
+                index = pos if self._aligned(other) else self._hash_function(node.key) % self._capacity
+                chain = self._writable_chain(index)
+                match = chain.contains(node.key)
+                if match is None:
+                    self._insert_node(chain, node.key, node.value)
+                else:
+                    match.value = resolve(node.key, match.value, node.value) if resolve is not None else node.value
+
+    def enable_collision_guard(self, limit: int = 16) -> None:
+        """
+        Starts watching chain lengths for collision attacks. Whenever an insert leaves a chain longer
+        than both limit and 4 times the load factor, the map switches to a freshly keyed hash function
+        and rehashes every node, which spreads the adversarial keys back over the buckets.
+
+        @param: limit - the chain length tolerated regardless of the load factor
+        @return: None
+        """
+        self._guard_limit = limit
+
+    def _check_chain(self, chain: LinkedList) -> None:
+        """Helper method reseeding the hash function if the chain just inserted into is pathologically long."""
+        length = chain.length()
+        if length <= self._guard_limit or length <= 4 * self.table_load():
+            return
+
+        limit = self._guard_limit
+        if self._stats is not None:
+            self._stats.record_reseed(length)
+
+        # The guard is off while rehashing so the rehash can't trigger another reseed
+        self._guard_limit = None
+        self._hash_function = rebind_hash_function(self._hash_function, keyed_hash_function())
+        self.resize_table(self._capacity)
+        self._guard_limit = limit
+
+    def occupancy(self) -> dict:
+        """
+        Returns the counts of live keys, empty buckets and tombstones, all kept up to date incrementally.
+        Chaining removes nodes outright, so there are never any tombstones.
+
+        @param: None
+        @return: a dict with the 'live', 'empty' and 'tombstones' counts
+        """
+        return {'live': self._size, 'empty': self._capacity - self._occupied, 'tombstones': 0}
+
+    def _iter_pinned(self, buckets: DynamicArray):
+        """Generator walking pinned buckets, unpinning them once done if the map still uses them."""
+        try:
+            for pos in range(buckets.length()):
+                for node in buckets[pos]:
+                    yield node.key, node.value
+        finally:
+            if buckets is self._buckets:
+                self._pins -= 1
+
+    def _copy_buckets(self) -> None:
+        """Helper method giving the map its own copy of the buckets a snapshot iterator has pinned."""
+        buckets = DynamicArray()
+        for pos in range(self._capacity):
+            # Nodes are inserted at the front, so copying the chain backwards keeps its order
+            nodes = [node for node in self._buckets[pos]]
+            chain = LinkedList()
+            for node in reversed(nodes):
+                chain.insert(node.key, node.value)
+            buckets.append(chain)
+        self._buckets = buckets
+        self._pins = 0
+
+    def _iter_items(self):
+        """Generator yielding every (key, value) pair, bucket by bucket."""
+        for pos in range(self._buckets.length()):
+            for node in self._buckets[pos]:
+                yield node.key, node.value
+
 
 def find_mode(da: DynamicArray) -> (DynamicArray, int):
     """
@@ -197,16 +523,12 @@ def find_mode(da: DynamicArray) -> (DynamicArray, int):
     mode_map = HashMap(da.length() // 3, hash_function_1)
     mode_count = 1
 
-    # Iterate through and utilize value as an occurrences counter, set to 1 or increment value,
+    # Iterate through and utilize value as an occurrences counter, increment() starts it at 1 or adds 1,
     # update mode_count alongside it to store the largest mode so far.
     for pos in range(da.length()):
-        if map.contains_key(da[pos]):
-            count = map.get(da[pos]) + 1
-            map.put(da[pos], count)
-            if count >= mode_count:
-                mode_count = count
-        else:
-            map.put(da[pos], 1)
+        count = map.increment(da[pos])
+        if count >= mode_count:
+            mode_count = count
 
     # Iterate through DA again, now compare each node's occurrence value to the mode count, if it matches,
     # put the key and its mode count onto mode_map, then get its keys to store into the return tuple.
@@ -402,6 +724,152 @@ if __name__ == "__main__":
     m.resize_table(2)
     print(m.get_keys())
 
+    print("\nincrement example 1")
+    print("-------------------")
+    m = HashMap(10, hash_function_2)
+    m.add_many(['a', 'b', 'a', 'c', 'a', 'b'])
+    print(m.increment('c', 5), m.increment('d'), m.get('a'), m.get_size())
+    print(m.most_common(2))
+
+    print("\nstats example 1")
+    print("---------------")
+    m = HashMap(10, hash_function_1)
+    m.enable_stats()
+    for i in range(20):
+        m.put('key' + str(i), i)
+    m.resize_table(40)
+    stats = m.stats()
+    print(stats['collisions'], len(stats['resizes']), stats['resizes'][-1]['new_capacity'])
+
+    print("\ncollision guard example 1")
+    print("-------------------------")
+    # Anagrams all share one hash under hash_function_1, so without the guard they form one long chain
+    keys = [''.join(letters) for letters in itertools.islice(itertools.permutations('abcdefgh'), 500)]
+    for guard in (False, True):
+        m = HashMap(50, hash_function_1)
+        if guard:
+            m.enable_collision_guard()
+        for key in keys:
+            m.put(key, key)
+        result = all(m.get(key) == key for key in keys)
+        longest = max(m._buckets[pos].length() for pos in range(m.get_capacity()))
+        print(guard, result, m.get_size(), longest <= 4 * m.table_load() + 16)
+
+    print("\nbloom filter example 1")
+    print("----------------------")
+    m = HashMap(50, hash_function_2)
+    m.enable_bloom_filter()
+    for i in range(200):
+        m.put('key' + str(i), i)
+    for i in range(0, 200, 2):
+        m.remove('key' + str(i))
+    m.resize_table(100)
+    result = all(m.get('key' + str(i)) == (i if i % 2 else None) for i in range(200))
+    result &= not any(m.contains_key('miss' + str(i)) for i in range(200))
+    m.clear()
+    print(result, m.get_size(), m.contains_key('key1'))
+
+    print("\nset operations example 1")
+    print("------------------------")
+    a = HashMap(10, hash_function_2)
+    b = HashMap(10, hash_function_2)
+    for i in range(10):
+        a.put('key' + str(i), i)
+        b.put('key' + str(i + 5), 10 * (i + 5))
+    print(sorted(a.union(b).get_keys()[i] for i in range(15)))
+    both = a.intersection(b, lambda key, mine, theirs: mine + theirs)
+    print(both.get_size(), both.get('key5'), both.get('key9'), both.get('key0'))
+    print(a.difference(b).get_size(), a.difference(b).contains_key('key5'))
+    a.update(b, lambda key, mine, theirs: max(mine, theirs))
+    print(a.get_size(), a.get('key5'), a.get('key14'), a.get('key0'))
+
+    print("\nfrom_iterable example 1")
+    print("-----------------------")
+    m = HashMap.from_iterable(('key' + str(i), i) for i in range(100))
+    print(m.get_size(), m.get_capacity(), m.get('key42'))
+    m = HashMap.from_keys(DynamicArray(['a', 'b', 'c']), 0)
+    print(m.get_size(), m.get_capacity(), m.get('b'))
+    m.reserve(100)
+    print(m.get_size(), m.get_capacity(), m.get('b'))
+
+    print("\nclear example 3")
+    print("---------------")
+    # Reusing a scratch map, every clear after the first is O(1)
+    m = HashMap(100, hash_function_1)
+    for rounds in range(3):
+        for i in range(rounds * 10, rounds * 10 + 20):
+            m.put('key' + str(i), i)
+        print(m.get_size(), m.empty_buckets(), m.occupancy(), m.get('key' + str(rounds * 10)), m.get('key0'))
+        m.clear()
+    print(m.get_size(), m.empty_buckets(), m.get_keys())
+
+    print("\nsorted index example 1")
+    print("----------------------")
+    m = HashMap(20, hash_function_2)
+    m.enable_sorted_index()
+    for word in ['pear', 'apple', 'peach', 'plum', 'apricot', 'banana', 'pea']:
+        m.put(word, len(word))
+    m.remove('plum')
+    print(list(m.sorted_keys()))
+    print(list(m.range('b', 'pea')), list(m.range('peach')), list(m.prefix('pea')), list(m.prefix('ap')))
+    m.resize_table(50)
+    m.put('cherry', 6)
+    print(list(m.range('b', 'd')), m.get_size())
+    m.clear()
+    print(list(m.sorted_keys()), list(m.prefix('p')))
+
+    print("\nhash memo and profiling example 1")
+    print("---------------------------------")
+    # An expensive hash function dominates the operations until hot keys are memoized
+    def slow_hash(key: str) -> int:
+        return hash_function_2(key * 200)
+
+    m = HashMap(100, slow_hash)
+    m.enable_profiling()
+    hot = ['key' + str(i) for i in range(10)]
+    for _ in range(100):
+        for key in hot:
+            m.put(key, m.get(key) or 0)
+    before = m.profile()
+    # The memo's sets are picked by the built-in hash, which is randomized per run, so a few hot keys
+    # may share a set and keep evicting each other
+    m.enable_hash_memo()
+    memo = m._hash_function
+    m.disable_profiling()
+    m.enable_profiling()
+    for _ in range(100):
+        for key in hot:
+            m.put(key, m.get(key) + 1)
+    after = m.profile()
+    print(before['operations'], before['hash_calls'], before['hash_share'] > 0.5)
+    print(after['operations'], after['memo_misses'] < 500, after['memo_hits'] > 1500, m.get('key3'))
+    m.disable_profiling()
+    # The memo, and what it cached, outlives the profiling it was put around
+    print(m._hash_function is memo, memo.hits > 1900)
+    m.disable_hash_memo()
+    print(m.profile(), m.get('key3'), m._hash_function is slow_hash)
+
+    print("\nsnapshot_iter example 1")
+    print("-----------------------")
+    m = HashMap(10, hash_function_1)
+    for i in range(10):
+        m.put('key' + str(i), i)
+    try:
+        for key in m.keys():
+            m.put(key, -1)
+            m.remove('key5')
+    except RuntimeError as error:
+        print(error)
+    # Only the keys visited before the map changed under the loop were set to -1
+    expected = sorted(m.items())
+    snapshot = m.snapshot_iter()
+    first = next(snapshot)
+    m.put('new key', 100)
+    m.remove('key0')
+    m.resize_table(50)
+    print(first, sorted([first] + list(snapshot)) == expected, len(expected))
+    print(m.get_size(), m.contains_key('key0'), m.get('new key'))
+
     print("\nPDF - find_mode example 2")
     print("-----------------------------")
     test_cases = (
@@ -0,0 +1,337 @@
+# Description: This is an Open Addressing HashMap in the style of SwissTable. A bytearray of control bytes parallel to
+# the slots holds a 7 bit fingerprint of each key's hash, or an empty/deleted marker. Slots are probed a group of
+# GROUP_WIDTH at a time: bytearray.find scans a group's control bytes for the fingerprint, and keys are only
+# compared on fingerprint matches, about once per lookup even with the table 87.5% full.
+
+
+from array import array
+
+from helper_classes import (DynamicArray, keyed_hash_function,
+                            hash_function_1, hash_function_2)
+
+
+class HashMap:
+    # Control bytes, a full slot holds its key's fingerprint (0 - 127) instead
+    EMPTY = 0x80
+    DELETED = 0xFE
+    GROUP_WIDTH = 16
+    # Odd 64 bit multiplier (2^64 / golden ratio) mixing the hash, its top bits pick the first group probed
+    MULTIPLIER = 0x9E3779B97F4A7C15
+    MAX_LOAD = 0.875
+
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Initialize new HashMap with at least capacity slots, rounded up to a power of two of at least one group.
+        """
+        self._hash_function = function
+        self._size = 0
+        self._allocate(self._capacity_for(capacity))
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        out = ''
+        for i in range(self._capacity):
+            entry = None
+            if self._ctrl[i] < self.EMPTY:
+                entry = str(self._keys[i]) + ': ' + str(self._values[i])
+            elif self._ctrl[i] == self.DELETED:
+                entry = 'deleted'
+            out += str(i) + ': ' + str(entry) + '\n'
+        return out
+
+    def get_size(self) -> int:
+        """Return size of map."""
+        return self._size
+
+    def get_capacity(self) -> int:
+        """Return capacity of map."""
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    @classmethod
+    def _capacity_for(cls, capacity: int) -> int:
+        """Helper method rounding capacity up to a power of two no smaller than GROUP_WIDTH."""
+        size = cls.GROUP_WIDTH
+        while size < capacity:
+            size *= 2
+        return size
+
+    def _hash(self, key: str) -> int:
+        """
+        Helper method mixing the key's hash with a multiply, so the weak low and high bits of the
+        repo's hash functions still spread keys over the groups. The low 7 bits are the fingerprint.
+        """
+        return (self._hash_function(key) * self.MULTIPLIER) & 0xFFFFFFFFFFFFFFFF
+
+    def _allocate(self, capacity: int) -> None:
+        """Helper method replacing the slots with empty ones of capacity, a power of two."""
+        self._capacity = capacity
+        self._group_mask = capacity // self.GROUP_WIDTH - 1
+        self._shift = 64 - self._group_mask.bit_length()
+        self._ctrl = bytearray([self.EMPTY]) * capacity
+        self._hashes = array('Q', [0]) * capacity
+        self._keys = DynamicArray([None] * capacity)
+        self._values = DynamicArray([None] * capacity)
+        self._deleted = 0
+
+    def _groups(self, hash: int):
+        """
+        Generator yielding the first slot of each group probed for a hash. Groups are probed
+        triangularly (+1, +2, +3...), which visits every group of a power of two table once.
+        """
+        group = hash >> self._shift
+        step = 0
+        while True:
+            yield group * self.GROUP_WIDTH
+            step += 1
+            group = (group + step) & self._group_mask
+
+    def _find(self, key: str, hash: int) -> int:
+        """
+        Helper method probing for a key, a group at a time.
+
+        @param: key - the key used to search, hash - its mixed hash
+        @return: the slot holding the key, or -1 if it is absent
+        """
+        ctrl, keys = self._ctrl, self._keys
+        fingerprint = hash & 0x7F
+        for start in self._groups(hash):
+            end = start + self.GROUP_WIDTH
+            slot = ctrl.find(fingerprint, start, end)
+            while slot >= 0:
+                if keys[slot] == key:
+                    return slot
+                slot = ctrl.find(fingerprint, slot + 1, end)
+            # A group with an empty slot was never full, so no key probed past it
+            if ctrl.find(self.EMPTY, start, end) >= 0:
+                return -1
+
+    def _insert(self, key: str, hash: int, value: object) -> None:
+        """
+        Helper method storing a key whose hash is already known, replacing the value if the key exists.
+        The first empty or deleted slot probed is used once the key is known to be absent.
+
+        @param: key, hash - the key and its mixed hash, value - the value for the key
+        @return: None
+        """
+        if self._size + self._deleted + 1 > self._capacity * self.MAX_LOAD:
+            # Rebuilding at the same capacity is enough when deleted slots are what fills the table
+            grow = self._size + 1 > self._capacity * self.MAX_LOAD / 2
+            self._rebuild(2 * self._capacity if grow else self._capacity)
+
+        ctrl, keys = self._ctrl, self._keys
+        fingerprint = hash & 0x7F
+        free = -1
+        for start in self._groups(hash):
+            end = start + self.GROUP_WIDTH
+            slot = ctrl.find(fingerprint, start, end)
+            while slot >= 0:
+                if keys[slot] == key:
+                    self._values[slot] = value
+                    return
+                slot = ctrl.find(fingerprint, slot + 1, end)
+
+            empty = ctrl.find(self.EMPTY, start, end)
+            if free < 0:
+                deleted = ctrl.find(self.DELETED, start, end)
+                free = empty if deleted < 0 or 0 <= empty < deleted else deleted
+            if empty >= 0:
+                break
+
+        if ctrl[free] == self.DELETED:
+            self._deleted -= 1
+        ctrl[free] = fingerprint
+        self._hashes[free] = hash
+        keys[free] = key
+        self._values[free] = value
+        self._size += 1
+
+    def _rebuild(self, new_capacity: int) -> None:
+        """Helper method moving every key into new slots of new_capacity, reusing the stored hashes."""
+        ctrl, hashes, keys, values = self._ctrl, self._hashes, self._keys, self._values
+        self._allocate(new_capacity)
+        self._size = 0
+        for slot in range(len(ctrl)):
+            if ctrl[slot] < self.EMPTY:
+                self._insert(keys[slot], hashes[slot], values[slot])
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates key/value pair in the hash map. If the key already exists, its value is replaced
+        with the new value, otherwise it is added on as usual. The table grows once it is 87.5% full.
+
+        @param: key - the key used to search, value - the value for the corresponding key
+        @return: None
+        """
+        self._insert(key, self._hash(key), value)
+
+    def table_load(self) -> float:
+        """
+        Computes the load factor using the formula size/capacity
+
+        @param: None
+        @return: a floating point number indicating the load factor
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of slots without a live key.
+
+        @param: None
+        @return: an integer indicating the amount of empty buckets
+        """
+        return self._capacity - self._size
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Changes capacity of the hash table, rounded up to a power of two that keeps the load factor
+        under MAX_LOAD, keeping all existing key/value pairs and dropping the deleted markers.
+        Only works when the new_capacity >= 1 and the new_capacity is >= the current size.
+
+        @param: the new capacity of the hash table
+        @return: None
+        """
+        if new_capacity >= 1 and new_capacity >= self._size:
+            self._rebuild(self._capacity_for(max(new_capacity, int(self._size / self.MAX_LOAD) + 1)))
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key
+
+        @param: key used to search
+        @return: the value corresponding to key, None if key is not found
+        """
+        slot = self._find(key, self._hash(key))
+        if slot >= 0:
+            return self._values[slot]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Checks if a given key is in the hash map.
+
+        @param: key - the key used to search
+        @return: boolean indicating if the map has the key
+        """
+        return self._find(key, self._hash(key)) >= 0
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the given key(if found) and its associated value from the hash map. The slot is marked
+        deleted so probes carry on past it, unless its group still has an empty slot.
+
+        @param: key used to search
+        @return: None
+        """
+        slot = self._find(key, self._hash(key))
+        if slot < 0:
+            return
+
+        # No probe ever went past a group with an empty slot, so the slot can simply become empty again
+        start = slot - slot % self.GROUP_WIDTH
+        if self._ctrl.find(self.EMPTY, start, start + self.GROUP_WIDTH) >= 0:
+            self._ctrl[slot] = self.EMPTY
+        else:
+            self._ctrl[slot] = self.DELETED
+            self._deleted += 1
+        self._keys[slot] = None
+        self._values[slot] = None
+        self._size -= 1
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map, does not change table capacity.
+
+        @param: None
+        @return: None
+        """
+        self._allocate(self._capacity)
+        self._size = 0
+
+    def get_keys(self) -> DynamicArray:
+        """
+        Returns a DA that has all the keys stored in the hash map.
+
+        @param: None
+        @return: the DA storing all the keys of hash map
+        """
+        keys_arr = DynamicArray()
+        for key, _ in self._iter_items():
+            keys_arr.append(key)
+        return keys_arr
+
+    def _iter_items(self):
+        """Generator yielding every live (key, value) pair in slot order."""
+        for slot in range(self._capacity):
+            if self._ctrl[slot] < self.EMPTY:
+                yield self._keys[slot], self._values[slot]
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nput example 1")
+    print("-------------")
+    m = HashMap(50, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nget example 1")
+    print("-------------")
+    m = HashMap(150, hash_function_2)
+    for i in range(200, 300, 7):
+        m.put(str(i), i * 10)
+    print(m.get_size(), m.get_capacity())
+    for i in range(200, 300, 21):
+        print(i, m.get(str(i)), m.get(str(i)) == i * 10)
+        print(i + 1, m.get(str(i + 1)), m.get(str(i + 1)) == (i + 1) * 10)
+
+    print("\nremove example 1")
+    print("----------------")
+    m = HashMap(50, hash_function_1)
+    print(m.get('key1'))
+    m.put('key1', 10)
+    print(m.get('key1'))
+    m.remove('key1')
+    print(m.get('key1'), m.get_size())
+    m.remove('key4')
+
+    print("\nresize and clear example 1")
+    print("--------------------------")
+    m = HashMap(10, hash_function_2)
+    for i in range(100, 200, 10):
+        m.put(str(i), str(i * 10))
+    m.resize_table(1)
+    print(sorted(m.get_keys()[i] for i in range(m.get_keys().length())), m.get_capacity())
+    m.clear()
+    print(m.get_size(), m.get_capacity())
+
+    print("\nkey comparisons example 1")
+    print("-------------------------")
+    # Keys are only compared on fingerprint matches, so lookups in a table 87.5% full still average
+    # about one comparison, the Open Addressing HashMap compares a key at every probe step. The keyed hash
+    # function is used since the sample ones map many of these keys to the very same hash.
+    import hash_map_oa
+
+    comparisons = [0]
+
+    class CountedKey(str):
+        def __eq__(self, other):
+            comparisons[0] += 1
+            return str.__eq__(self, other)
+
+        __hash__ = str.__hash__
+
+    keys = [CountedKey('key' + str(i)) for i in range(1792)]
+    for label, engine, capacity in (('swiss', HashMap, 2048), ('oa', hash_map_oa.HashMap, 4096)):
+        m = engine(capacity, keyed_hash_function(0))
+        for key in keys:
+            m.put(key, 1)
+        comparisons[0] = 0
+        for key in keys:
+            m.get(key)
+        print(label, round(m.table_load(), 3), round(comparisons[0] / len(keys), 1))
@@ -1,3 +1,11 @@
+import builtins
+import heapq
+import math
+import random
+import secrets
+import time
+
+
 # -------------- Used by both HashMaps (SC & OA)  -------------- #
 
 class DynamicArrayException(Exception):
@@ -70,6 +78,93 @@ class DynamicArray:
         return len(self._data)
 
 
+class EpochArray(DynamicArray):
+    """
+    Dynamic Array whose elements can all be reset at once in O(1) with reset().
+    Every slot is stamped with the generation it was last written in, a slot stamped with an older
+    generation reads as the default value (None, or default() if a factory is given). Reading never
+    allocates: every stale slot reads as one shared default value, which must not be modified, and
+    get_writable() gives a slot a default value of its own to modify in place.
+    """
+
+    def __init__(self, length: int = 0, default=None) -> None:
+        """Initialize an array of length slots that all read as the default value."""
+        super().__init__()
+        self._data = [None] * length
+        self._stamps = [0] * length
+        self._generation = 1
+        self._default = default
+        self._empty = default() if default is not None else None
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return str([self.get_at_index(index) for index in range(self.length())])
+
+    def reset(self) -> None:
+        """Make every slot read as the default value again, without touching the slots."""
+        self._generation += 1
+
+    def grow(self, count: int) -> None:
+        """Add count slots at the end of the array that read as the default value."""
+        self._data.extend([None] * count)
+        self._stamps.extend([0] * count)
+
+    def append(self, value: object) -> None:
+        """Add new element at the end of the array."""
+        self._data.append(value)
+        self._stamps.append(self._generation)
+
+    def pop(self):
+        """Remove element from end of the array and return it."""
+        value = self.get_at_index(self.length() - 1)
+        self._data.pop()
+        self._stamps.pop()
+        return value
+
+    def swap(self, i: int, j: int) -> None:
+        """Swap two elements in array given their indices."""
+        self._data[i], self._data[j] = self._data[j], self._data[i]
+        self._stamps[i], self._stamps[j] = self._stamps[j], self._stamps[i]
+
+    def get_at_index(self, index: int):
+        """Return value of element at a given index, the shared default value if it is stale."""
+        if index < 0 or index >= len(self._data):
+            raise DynamicArrayException
+        if self._stamps[index] != self._generation:
+            return self._empty
+        return self._data[index]
+
+    def get_writable(self, index: int):
+        """Return value of element at a given index to modify in place, replacing it with a new default if stale."""
+        if index < 0 or index >= len(self._data):
+            raise DynamicArrayException
+        if self._stamps[index] != self._generation:
+            self._stamps[index] = self._generation
+            self._data[index] = self._default() if self._default is not None else None
+        return self._data[index]
+
+    def set_at_index(self, index: int, value: object) -> None:
+        """Set value of element at a given index."""
+        if index < 0 or index >= len(self._data):
+            raise DynamicArrayException
+        self._data[index] = value
+        self._stamps[index] = self._generation
+
+
+def sized_iterable(items, expected_size: int = None) -> (object, int):
+    """
+    Returns an iterable over items (which may be a DynamicArray) together with its length, used to size
+    a HashMap before loading it. An iterator without a length is only copied if expected_size isn't given.
+    """
+    if isinstance(items, DynamicArray):
+        return (items[pos] for pos in range(items.length())), items.length()
+    if expected_size is not None:
+        return items, expected_size
+    if not hasattr(items, '__len__'):
+        items = list(items)
+    return items, len(items)
+
+
 def hash_function_1(key: str) -> int:
     """Sample Hash function #1 to be used with HashMap implementation"""
     hash = 0
@@ -96,6 +191,47 @@ def hash_function_3(key: int) -> int:
     return hash
 
 
+def next_prime(n: int) -> int:
+    """Returns the smallest prime number >= n."""
+    n = max(2, n)
+    while any(n % divisor == 0 for divisor in range(2, math.isqrt(n) + 1)):
+        n += 1
+    return n
+
+
+def keyed_hash_function(seed: int = None):
+    """
+    Returns a hash function keyed with a secret 64 bit seed (random unless given).
+    Unlike the sample hash functions above, which anyone can invert to build colliding keys
+    (e.g. anagrams under hash_function_1), its output can't be predicted without the seed.
+    """
+    if seed is None:
+        seed = secrets.randbits(64)
+
+    def keyed_hash(key) -> int:
+        return hash((seed, key)) & 0xFFFFFFFFFFFFFFFF
+
+    keyed_hash.seed = seed
+    return keyed_hash
+
+
+def seeded_hash_function(function, seed: int = None):
+    """
+    Returns a seeded version of a hash function: its output is mixed with a 64 bit seed (random unless given)
+    so the same function with two seeds behaves like two independent functions over the keys it tells apart.
+    Keys the base function maps to the same hash (e.g. anagrams under hash_function_1) still collide.
+    """
+    if seed is None:
+        seed = secrets.randbits(64)
+
+    def seeded_hash(key) -> int:
+        hash = ((function(key) ^ seed) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        return hash ^ (hash >> 29)
+
+    seeded_hash.seed = seed
+    return seeded_hash
+
+
 # --------- For use in Separate Chaining (SC) HashMap  --------- #
 
 class SLNode:
@@ -117,11 +253,14 @@ class SLNode:
 class LinkedListIterator:
     """
     Separate iterator class for LinkedList
+    Fail-fast when given its list: it raises RuntimeError once the list has had a node inserted or removed.
     """
 
-    def __init__(self, current_node: SLNode) -> None:
-        """Initialize the iterator with a node."""
+    def __init__(self, current_node: SLNode, linked_list: "LinkedList" = None) -> None:
+        """Initialize the iterator with a node, and the list it belongs to if it should be fail-fast."""
         self._node = current_node
+        self._list = linked_list
+        self._mod_count = linked_list._mod_count if linked_list is not None else None
 
     def __iter__(self) -> "LinkedListIterator":
         """Return the iterator."""
@@ -129,6 +268,8 @@ class LinkedListIterator:
 
     def __next__(self) -> SLNode:
         """Obtain next node and advance iterator."""
+        if self._list is not None and self._list._mod_count != self._mod_count:
+            raise RuntimeError("LinkedList changed during iteration")
 
         if not self._node:
             raise StopIteration
@@ -151,6 +292,8 @@ class LinkedList:
         """
         self._head = None
         self._size = 0
+        # Incremented on every insert and removal, so iterators can tell the list changed under them
+        self._mod_count = 0
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
@@ -165,13 +308,14 @@ class LinkedList:
         return 'SLL [' + content + ']'
 
     def __iter__(self) -> LinkedListIterator:
-        """Return an iterator for the list, starting at the head."""
-        return LinkedListIterator(self._head)
+        """Return a fail-fast iterator for the list, starting at the head."""
+        return LinkedListIterator(self._head, self)
 
     def insert(self, key: str, value: object) -> None:
         """Insert new node at front of the list."""
         self._head = SLNode(key, value, self._head)
         self._size += 1
+        self._mod_count += 1
 
     def remove(self, key: str) -> bool:
         """
@@ -187,6 +331,7 @@ class LinkedList:
                 else:
                     self._head = node.next
                 self._size -= 1
+                self._mod_count += 1
                 return True
 
             previous, node = node, node.next
@@ -210,12 +355,635 @@ class LinkedList:
 
 class HashEntry:
 
-    def __init__(self, key: str, value: object) -> None:
-        """Initialize an entry for use in a hash map."""
+    def __init__(self, key: str, value: object, hash: int = None) -> None:
+        """
+        Initialize an entry for use in a hash map, optionally caching the key's hash
+        so the map can be resized or merged without calling its hash function again.
+        """
         self.key = key
         self.value = value
         self.is_tombstone = False
+        self.hash = hash
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
         return f"K: {self.key} V: {self.value} TS: {self.is_tombstone}"
+
+
+# -------- Instrumentation, used by both HashMaps (SC & OA) -------- #
+
+class MapStats:
+    """
+    Opt-in collector of HashMap internals: probe and chain length histograms, collisions,
+    tombstone hits and resize events. Histograms are lists where position i counts the operations
+    that saw a length of i. An optional callback(event, data) is called for every recorded event.
+    """
+
+    def __init__(self, callback=None) -> None:
+        """Initialize empty counters with an optional event callback."""
+        self.probe_lengths = []
+        self.chain_lengths = []
+        self.collisions = 0
+        self.tombstone_hits = 0
+        self.resizes = []
+        self.reseeds = 0
+        self.callback = callback
+
+    @staticmethod
+    def _bump(histogram: list, length: int) -> None:
+        """Increment the histogram slot of the given length, growing the list if needed."""
+        if length >= len(histogram):
+            histogram.extend([0] * (length + 1 - len(histogram)))
+        histogram[length] += 1
+
+    def record_probe(self, length: int, tombstones: int) -> None:
+        """Record an open addressing probe that stepped length times and passed tombstones tombstones."""
+        self._bump(self.probe_lengths, length)
+        if length:
+            self.collisions += 1
+        self.tombstone_hits += tombstones
+        if self.callback:
+            self.callback('probe', {'length': length, 'tombstones': tombstones})
+
+    def record_chain(self, length: int, inserting: bool = False) -> None:
+        """Record a separate chaining bucket visit, inserting into a non-empty chain is a collision."""
+        self._bump(self.chain_lengths, length)
+        if inserting and length:
+            self.collisions += 1
+        if self.callback:
+            self.callback('chain', {'length': length, 'inserting': inserting})
+
+    def record_resize(self, old_capacity: int, new_capacity: int, seconds: float) -> None:
+        """Record a resize_table event and how long it took."""
+        event = {'old_capacity': old_capacity, 'new_capacity': new_capacity, 'seconds': seconds}
+        self.resizes.append(event)
+        if self.callback:
+            self.callback('resize', event)
+
+    def record_reseed(self, length: int) -> None:
+        """Record a switch to a freshly keyed hash function, triggered by a chain or probe of length."""
+        self.reseeds += 1
+        if self.callback:
+            self.callback('reseed', {'length': length})
+
+    def as_dict(self) -> dict:
+        """Return a snapshot of everything collected so far."""
+        return {
+            'probe_lengths': list(self.probe_lengths),
+            'chain_lengths': list(self.chain_lengths),
+            'collisions': self.collisions,
+            'tombstone_hits': self.tombstone_hits,
+            'resizes': [dict(event) for event in self.resizes],
+            'reseeds': self.reseeds,
+        }
+
+
+# ------ Hash function wrappers, used by both HashMaps (SC & OA) ------ #
+
+class HashWrapper:
+    """
+    Base class of the callables a HashMap can put around its hash function.
+    Wrappers can be stacked, each one calls the function it wraps, and never change the hashes.
+    Maps may share a hash function, so a wrapper is never changed to wrap a function hashing differently,
+    with_function() returns a new one instead. Removing a wrapper from under another is safe in place.
+    """
+
+    def __init__(self, function) -> None:
+        """Initialize the wrapper around a hash function."""
+        self.function = function
+
+    def __call__(self, key) -> int:
+        """Return the hash of key."""
+        return self.function(key)
+
+    def with_function(self, function) -> "HashWrapper":
+        """Return the same kind of wrapper around another function."""
+        return type(self)(function)
+
+
+class HashMemo(HashWrapper):
+    """
+    Bounded memo of a hash function's results for hot keys.
+    Two way set associative like a CPU cache: a key can only be cached in one of the two slots of the set
+    picked by its built-in hash, and evicts the older of the two keys there. Cached keys are matched by
+    identity first, then by value.
+    """
+
+    _EMPTY = object()
+
+    def __init__(self, function, capacity: int = 1024) -> None:
+        """Initialize an empty memo of at least capacity slots, rounded up to a power of two."""
+        super().__init__(function)
+        size = 1 << max(1, capacity - 1).bit_length()
+        self._mask = size // 2 - 1
+        self._keys = [self._EMPTY] * size
+        self._hashes = [0] * size
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, key) -> int:
+        """Return the hash of key, calling the wrapped function only if it isn't cached."""
+        keys = self._keys
+        slot = 2 * (builtins.hash(key) & self._mask)
+        for way in (slot, slot + 1):
+            cached = keys[way]
+            if cached is key or (cached is not self._EMPTY and cached == key):
+                self.hits += 1
+                return self._hashes[way]
+
+        # The newest key of a set is kept in its first slot, so the second one holds the older key
+        hash = self.function(key)
+        keys[slot + 1], self._hashes[slot + 1] = keys[slot], self._hashes[slot]
+        keys[slot], self._hashes[slot] = key, hash
+        self.misses += 1
+        return hash
+
+    def with_function(self, function) -> "HashMemo":
+        """Return an empty memo of the same size around another function."""
+        return HashMemo(function, len(self._keys))
+
+
+class HashProfile:
+    """
+    Opt-in profiler timing a hash function and the map operations that call it, so the time spent
+    hashing can be told apart from the time spent probing and comparing keys.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty counters."""
+        self.hash_calls = 0
+        self.hash_seconds = 0.0
+        self.operations = 0
+        self.operation_seconds = 0.0
+
+    def wrap_operation(self, method):
+        """Return a version of a bound map method whose calls are timed as operations."""
+        def profiled_operation(*args):
+            start = time.perf_counter()
+            try:
+                return method(*args)
+            finally:
+                self.operation_seconds += time.perf_counter() - start
+                self.operations += 1
+        return profiled_operation
+
+    def as_dict(self) -> dict:
+        """Return the timings as a plain dict, the probe time is whatever the operations didn't spend hashing."""
+        return {
+            'operations': self.operations,
+            'operation_seconds': self.operation_seconds,
+            'hash_calls': self.hash_calls,
+            'hash_seconds': self.hash_seconds,
+            'probe_seconds': max(0.0, self.operation_seconds - self.hash_seconds),
+            'hash_share': self.hash_seconds / self.operation_seconds if self.operation_seconds else None,
+        }
+
+
+class ProfiledHash(HashWrapper):
+    """Hash function wrapper adding the time of every call to a HashProfile."""
+
+    def __init__(self, function, profile: HashProfile) -> None:
+        """Initialize the wrapper around a hash function, reporting to profile."""
+        super().__init__(function)
+        self.profile = profile
+
+    def __call__(self, key) -> int:
+        """Return the hash of key, adding the time taken to the profile's hashing time."""
+        start = time.perf_counter()
+        hash = self.function(key)
+        self.profile.hash_seconds += time.perf_counter() - start
+        self.profile.hash_calls += 1
+        return hash
+
+    def with_function(self, function) -> "ProfiledHash":
+        """Return a wrapper around another function, reporting to the same profile."""
+        return ProfiledHash(function, self.profile)
+
+
+def find_hash_wrapper(function, wrapper_type: type) -> HashWrapper:
+    """Returns the outermost wrapper of the given type around a hash function, None if there isn't one."""
+    while isinstance(function, HashWrapper):
+        if isinstance(function, wrapper_type):
+            return function
+        function = function.function
+    return None
+
+
+def unwrap_hash_function(function, wrapper_type: type):
+    """
+    Returns the hash function without the wrappers of the given type. The other wrappers are kept as they
+    are, along with their state, the one around a removed wrapper is just pointed past it.
+    """
+    while isinstance(function, wrapper_type):
+        function = function.function
+    outer = function
+    while isinstance(outer, HashWrapper):
+        if isinstance(outer.function, wrapper_type):
+            outer.function = outer.function.function
+        else:
+            outer = outer.function
+    return function
+
+
+def rebind_hash_function(function, base):
+    """Returns the hash function with the function inside all its wrappers replaced by base."""
+    if isinstance(function, HashWrapper):
+        return function.with_function(rebind_hash_function(function.function, base))
+    return base
+
+
+# ------ Negative lookup filter, used by both HashMaps (SC & OA) ------ #
+
+class CountingBloomFilter:
+    """
+    Counting Bloom filter answering "definitely absent" or "maybe present" for a key.
+    Each position is a saturating byte counter instead of a bit so keys can be removed again,
+    a saturated counter is never decremented so the filter never reports a stored key as absent.
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float = 0.01) -> None:
+        """Initialize a filter sized to keep the false positive rate for up to capacity keys."""
+        self.capacity = max(1, capacity)
+        self.false_positive_rate = false_positive_rate
+        self.count = 0
+
+        # Optimal sizes: m = -n ln p / (ln 2)^2 counters and k = m / n ln 2 hash positions
+        size = math.ceil(-self.capacity * math.log(false_positive_rate) / (math.log(2) ** 2))
+        self._counters = bytearray(max(8, size))
+        self._num_hashes = max(1, round(len(self._counters) / self.capacity * math.log(2)))
+
+    def _positions(self, key):
+        """Generator yielding the counter positions of a key, using double hashing over the built-in hash."""
+        hash = (builtins.hash(key) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        step = (hash >> 32) | 1
+        size = len(self._counters)
+        for i in range(self._num_hashes):
+            yield (hash + i * step) % size
+
+    def add(self, key: object) -> None:
+        """Record a key, counters saturate at 255."""
+        counters = self._counters
+        for pos in self._positions(key):
+            if counters[pos] < 255:
+                counters[pos] += 1
+        self.count += 1
+
+    def remove(self, key: object) -> None:
+        """Forget a key that was previously added."""
+        counters = self._counters
+        for pos in self._positions(key):
+            if 0 < counters[pos] < 255:
+                counters[pos] -= 1
+        self.count -= 1
+
+    def might_contain(self, key: object) -> bool:
+        """Return False if the key was definitely never added, True if it may have been."""
+        counters = self._counters
+        for pos in self._positions(key):
+            if not counters[pos]:
+                return False
+        return True
+
+    def clear(self) -> None:
+        """Forget every key, keeping the size."""
+        self._counters = bytearray(len(self._counters))
+        self.count = 0
+
+
+# ------ Ordered secondary index, used by both HashMaps (SC & OA) ------ #
+
+class SkipListNode:
+    """
+    Skip list node holding a key and its forward links, one per level the node takes part in
+    """
+
+    def __init__(self, key: object, level: int) -> None:
+        """Initialize node given a key and its amount of levels."""
+        self.key = key
+        self.next = [None] * level
+
+
+class SkipList:
+    """
+    Class implementing a Skip List of unique, mutually comparable keys kept in ascending order
+    Supported methods are: insert, remove, clear, length, iter_from
+    Each node is promoted to the next level with probability 1/2, giving O(log n) expected searches.
+    """
+
+    MAX_LEVEL = 32
+
+    def __init__(self) -> None:
+        """Initialize an empty skip list, the head is a sentinel taking part in every level."""
+        self._head = SkipListNode(None, self.MAX_LEVEL)
+        self._level = 1
+        self._size = 0
+
+    def _random_level(self) -> int:
+        """Return the amount of levels of a new node, each extra level with probability 1/2."""
+        level = 1
+        while level < self.MAX_LEVEL and random.getrandbits(1):
+            level += 1
+        return level
+
+    def _predecessors(self, key: object) -> list:
+        """Return the last node before key on every level, the head for the levels not in use."""
+        update = [self._head] * self.MAX_LEVEL
+        node = self._head
+        for level in reversed(range(self._level)):
+            while node.next[level] is not None and node.next[level].key < key:
+                node = node.next[level]
+            update[level] = node
+        return update
+
+    def insert(self, key: object) -> bool:
+        """
+        Insert a key in order.
+        Return True if it was added, False if it was already in the list.
+        """
+        update = self._predecessors(key)
+        node = update[0].next[0]
+        if node is not None and node.key == key:
+            return False
+
+        level = self._random_level()
+        self._level = max(self._level, level)
+        node = SkipListNode(key, level)
+        for pos in range(level):
+            node.next[pos] = update[pos].next[pos]
+            update[pos].next[pos] = node
+        self._size += 1
+        return True
+
+    def remove(self, key: object) -> bool:
+        """
+        Remove a key.
+        Return True if removal was successful, False otherwise.
+        """
+        update = self._predecessors(key)
+        node = update[0].next[0]
+        if node is None or node.key != key:
+            return False
+
+        for pos in range(len(node.next)):
+            update[pos].next[pos] = node.next[pos]
+        while self._level > 1 and self._head.next[self._level - 1] is None:
+            self._level -= 1
+        self._size -= 1
+        return True
+
+    def clear(self) -> None:
+        """Remove every key."""
+        self._head = SkipListNode(None, self.MAX_LEVEL)
+        self._level = 1
+        self._size = 0
+
+    def length(self) -> int:
+        """Return the amount of keys in the list."""
+        return self._size
+
+    def iter_from(self, lo: object = None):
+        """Generator yielding the keys >= lo in ascending order, every key if lo is None."""
+        node = self._head.next[0] if lo is None else self._predecessors(lo)[0].next[0]
+        while node is not None:
+            yield node.key
+            node = node.next[0]
+
+
+# ------------ Methods shared by both HashMaps (SC & OA) ------------ #
+
+class HashMapMixin:
+    """
+    Methods implemented the same way by the Separate Chaining and Open Addressing HashMaps, on top of
+    what each map provides: _iter_items(), _iter_pinned(), increment(), _size, _capacity, _buckets, _pins,
+    _mod_count, _hash_function, PROFILED_OPERATIONS and the opt-in _stats, _guard_limit, _bloom, _sorted_index
+    and _profile attributes.
+    """
+
+    def add_many(self, keys) -> None:
+        """
+        Increments the count of every key in an iterable (or DynamicArray) by 1.
+
+        @param: keys - the keys to count, repeats are counted once per occurrence
+        @return: None
+        """
+        if isinstance(keys, DynamicArray):
+            keys = (keys[pos] for pos in range(keys.length()))
+        for key in keys:
+            self.increment(key)
+
+    def most_common(self, n: int = None) -> DynamicArray:
+        """
+        Returns the n key/count pairs with the highest counts, selected with a heap.
+
+        @param: n - the amount of pairs to return, every pair if None
+        @return: a DA of (key, count) tuples ordered from highest count to lowest
+        """
+        if n is None:
+            n = self._size
+        result = DynamicArray()
+        for item in heapq.nlargest(n, self._iter_items(), key=lambda item: item[1]):
+            result.append(item)
+        return result
+
+    def enable_stats(self, callback=None) -> None:
+        """
+        Starts collecting chain or probe length histograms, collisions, tombstone hits and resize events.
+        Instrumentation is off by default so lookups pay at most a None check for it.
+
+        @param: callback - optional callback(event, data) called for every recorded event
+        @return: None
+        """
+        self._stats = MapStats(callback)
+
+    def stats(self) -> dict:
+        """
+        Returns the stats collected since enable_stats() was called.
+
+        @param: None
+        @return: a dict of the chain or probe length histogram, collisions, tombstone hits and resize events,
+                 None if instrumentation is disabled
+        """
+        if self._stats is None:
+            return None
+        return self._stats.as_dict()
+
+    def disable_stats(self) -> None:
+        """Stops collecting stats and discards what was collected."""
+        self._stats = None
+
+    def disable_collision_guard(self) -> None:
+        """Stops watching chain or probe lengths, the current hash function is kept."""
+        self._guard_limit = None
+
+    def enable_bloom_filter(self, false_positive_rate: float = 0.01) -> None:
+        """
+        Puts a counting Bloom filter in front of the buckets, so most lookups of absent keys are answered
+        without hashing the key with the map's function or walking its chain or probe sequence. Inserts and
+        removals keep it up to date, and it is rebuilt on resize_table() and whenever the map outgrows it.
+
+        @param: false_positive_rate - the fraction of absent keys allowed through to the buckets
+        @return: None
+        """
+        self._bloom = CountingBloomFilter(max(self._size, self._capacity), false_positive_rate)
+        self._rebuild_bloom()
+
+    def disable_bloom_filter(self) -> None:
+        """Removes the Bloom filter, every lookup goes to the buckets again."""
+        self._bloom = None
+
+    def _rebuild_bloom(self) -> None:
+        """Helper method replacing the Bloom filter with one sized for twice the current keys and capacity."""
+        bloom = CountingBloomFilter(2 * max(self._size, self._capacity), self._bloom.false_positive_rate)
+        for key, _ in self._iter_items():
+            bloom.add(key)
+        self._bloom = bloom
+
+    def _bloom_add(self, key: str) -> None:
+        """Helper method recording a newly inserted key in the Bloom filter, rebuilding it once it's full."""
+        if self._bloom.count >= self._bloom.capacity:
+            self._rebuild_bloom()
+        else:
+            self._bloom.add(key)
+
+    def enable_sorted_index(self) -> None:
+        """
+        Keeps the keys in a skip list next to the buckets, so sorted_keys(), range() and prefix() walk the
+        keys in order in O(log n + k) instead of sorting all of them. Inserts and removals keep it up to date.
+        Every key must be comparable with the others.
+
+        @param: None
+        @return: None
+        """
+        index = SkipList()
+        for key, _ in self._iter_items():
+            index.insert(key)
+        self._sorted_index = index
+
+    def disable_sorted_index(self) -> None:
+        """Removes the sorted index, ordered queries sort the keys again."""
+        self._sorted_index = None
+
+    def sorted_keys(self, lo: str = None):
+        """
+        Generator yielding the keys in ascending order, starting at lo if given.
+        Without a sorted index the keys are collected and sorted first.
+
+        @param: lo - the smallest key yielded, None to start from the smallest key
+        @return: a generator of keys
+        """
+        if self._sorted_index is not None:
+            yield from self._sorted_index.iter_from(lo)
+        else:
+            yield from sorted(key for key, _ in self._iter_items() if lo is None or key >= lo)
+
+    def range(self, lo: str = None, hi: str = None):
+        """
+        Generator yielding the keys k with lo <= k < hi in ascending order.
+
+        @param: lo, hi - the bounds of the range, None for no bound on that side
+        @return: a generator of keys
+        """
+        for key in self.sorted_keys(lo):
+            if hi is not None and key >= hi:
+                return
+            yield key
+
+    def prefix(self, prefix: str):
+        """
+        Generator yielding the keys starting with prefix in ascending order.
+
+        @param: prefix - the string every key yielded starts with
+        @return: a generator of keys
+        """
+        for key in self.sorted_keys(prefix):
+            if not key.startswith(prefix):
+                return
+            yield key
+
+    def enable_hash_memo(self, capacity: int = 1024) -> None:
+        """
+        Puts a bounded memo in front of the hash function, so hot keys are only hashed by it once.
+        Worth it for hash functions that cost more than a lookup in the memo, keys must also be
+        hashable by the built-in hash.
+
+        @param: capacity - the amount of hashes kept, a new key evicts an older one when the memo is full
+        @return: None
+        """
+        self.disable_hash_memo()
+        self._hash_function = HashMemo(self._hash_function, capacity)
+
+    def disable_hash_memo(self) -> None:
+        """Removes the memo, every key is hashed by the hash function again."""
+        self._hash_function = unwrap_hash_function(self._hash_function, HashMemo)
+
+    def enable_profiling(self, profile: HashProfile = None) -> None:
+        """
+        Starts timing the hash function and the operations calling it, see profile().
+        The profiled operations are shadowed on this map by timed versions, so other maps pay nothing for it.
+
+        @param: profile - the HashProfile to keep adding the timings to, e.g. the one of a map this map
+                          replaces, a new one if not given
+        @return: None
+        """
+        self.disable_profiling()
+        self._profile = profile if profile is not None else HashProfile()
+        self._hash_function = ProfiledHash(self._hash_function, self._profile)
+        for name in self.PROFILED_OPERATIONS:
+            setattr(self, name, self._profile.wrap_operation(getattr(self, name)))
+
+    def disable_profiling(self) -> None:
+        """Stops timing and discards the timings, the operations are the class's own again."""
+        self._hash_function = unwrap_hash_function(self._hash_function, ProfiledHash)
+        for name in self.PROFILED_OPERATIONS:
+            self.__dict__.pop(name, None)
+        self._profile = None
+
+    def profile(self) -> dict:
+        """
+        Returns the timings collected since enable_profiling() was called.
+
+        @param: None
+        @return: a dict of the operations and hash calls made, the seconds spent hashing and the rest
+                 spent probing and comparing keys, plus the memo's hits and misses if a memo is enabled,
+                 None if profiling is disabled
+        """
+        if self._profile is None:
+            return None
+        result = self._profile.as_dict()
+        memo = find_hash_wrapper(self._hash_function, HashMemo)
+        if memo is not None:
+            result['memo_hits'] = memo.hits
+            result['memo_misses'] = memo.misses
+        return result
+
+    def keys(self):
+        """
+        Generator yielding every key, bucket by bucket, without copying them like get_keys().
+        Fail-fast: raises RuntimeError if a key is added or removed or the table is resized or cleared
+        while iterating, updating the value of a key is fine. Use snapshot_iter() to iterate while writing.
+        """
+        for key, _ in self.items():
+            yield key
+
+    def items(self):
+        """Generator yielding every (key, value) pair, bucket by bucket, fail-fast like keys()."""
+        mod_count = self._mod_count
+        for item in self._iter_items():
+            if self._mod_count != mod_count:
+                raise RuntimeError("HashMap changed during iteration")
+            yield item
+        if self._mod_count != mod_count:
+            raise RuntimeError("HashMap changed during iteration")
+
+    def snapshot_iter(self):
+        """
+        Returns an iterator over the (key, value) pairs as they were when it was called, which never raises
+        however the map changes meanwhile. Nothing is copied up front, the current buckets are pinned instead:
+        a resize builds new buckets anyway, and the first other write while a snapshot is pinned copies the
+        buckets for the map to change, leaving the pinned ones to the snapshot.
+
+        @param: None
+        @return: a generator of (key, value) pairs
+        """
+        self._pins += 1
+        return self._iter_pinned(self._buckets)